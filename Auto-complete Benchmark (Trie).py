@@ -0,0 +1,204 @@
+import argparse  # command line options of the benchmark
+import gc  # to collect between measurements
+import importlib.util  # to load the CatsTrie script, its file name isn't a module name
+import json  # results are printed as JSON so runs can be compared
+import os  # to find the CatsTrie script next to this one
+import platform  # to record where the results were measured
+import random  # seeded corpus generators
+import sys  # to register the loaded module
+import time  # to time builds and lookups
+import tracemalloc  # to measure peak memory of builds
+
+LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+TRIE_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Auto-complete Suggestion (Trie).py")
+
+def load_trie(path=TRIE_SCRIPT):
+    """
+    Function description : Loads the Auto-complete Suggestion (Trie) script as a module and returns it
+    """
+    spec = importlib.util.spec_from_file_location("cats_trie", path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["cats_trie"] = module               ### so the process pool of build_parallel can pickle its functions
+    spec.loader.exec_module(module)
+    return module
+
+def random_word(rng, length, alphabet=LOWERCASE):
+    """ A word of length random characters of alphabet """
+    return "".join(rng.choice(alphabet) for _ in range(length))
+
+def zipf_corpus(n, vocabulary=10000, exponent=1.1, seed=0):
+    """
+    Function description : Returns n sentences drawn from a vocabulary of random words with Zipfian frequencies, the word
+                           of rank r is used in proportion to 1 / r ** exponent, like real query logs
+
+    Time complexity : O(V + N log V), where V is the vocabulary size and N the number of sentences
+    """
+    rng = random.Random(seed)
+    words = [random_word(rng, rng.randint(3, 12)) for _ in range(vocabulary)]
+    weights = [1 / rank ** exponent for rank in range(1, vocabulary + 1)]
+    return rng.choices(words, weights, k=n)
+
+def length_corpus(n, min_length=1, max_length=64, seed=0):
+    """
+    Function description : Returns n random sentences with lengths spread uniformly from min_length to max_length, mostly
+                           distinct, for the cost of long sentences and many nodes
+    """
+    rng = random.Random(seed)
+    return [random_word(rng, rng.randint(min_length, max_length)) for _ in range(n)]
+
+def shared_prefix_corpus(n, prefixes=50, prefix_length=10, suffix_length=4, seed=0):
+    """
+    Function description : Returns n sentences that each start with one of a few long prefixes, for deep shared paths where
+                           every insert updates the caches of many nodes
+    """
+    rng = random.Random(seed)
+    stems = [random_word(rng, prefix_length) for _ in range(prefixes)]
+    return [rng.choice(stems) + random_word(rng, rng.randint(0, suffix_length)) for _ in range(n)]
+
+CORPORA = {"zipf": zipf_corpus, "lengths": length_corpus, "shared_prefix": shared_prefix_corpus}
+
+def percentiles(samples):
+    """ Percentiles of samples in microseconds """
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def at(fraction):
+        return samples[min(len(samples) - 1, int(fraction * len(samples)))] / 1000
+
+    return {"p50": at(0.50), "p90": at(0.90), "p99": at(0.99), "max": at(1.0), "count": len(samples)}
+
+def measure_build(trie, sentences, repeats, **options):
+    """
+    Function description : Builds a CatsTrie of sentences repeats times and returns the best time and throughput, then builds
+                           it once more under tracemalloc for the peak memory, which tracing would otherwise slow down
+    """
+    times = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        trie.CatsTrie(sentences, **options)
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    built = trie.CatsTrie(sentences, **options)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(times)
+    return built, {"seconds": best,
+                   "sentences_per_second": len(sentences) / best if best else 0.0,
+                   "nodes": built.node_count,
+                   "retained_bytes": current,
+                   "peak_bytes": peak,
+                   "bytes_per_node": current / built.node_count}
+
+def lookup_prompts(sentences, queries, max_length, seed):
+    """
+    Function description : Returns prompts grouped by length from 0 to max_length, prefixes of sampled sentences so most
+                           lookups find a suggestion, plus a share of random prompts that miss
+    """
+    rng = random.Random(seed)
+    prompts = {}
+    for length in range(max_length + 1):
+        group = []
+        for _ in range(queries):
+            sentence = rng.choice(sentences)
+            if len(sentence) >= length and rng.random() < 0.9:
+                group.append(sentence[:length])
+            else:
+                group.append(random_word(rng, length))
+        prompts[length] = group
+    return prompts
+
+def prefix_prompts(sentences, queries, seed):
+    """
+    Function description : Returns every prefix of queries sampled sentences, from the empty one to the whole sentence, as a 
+                           user typing them one character at a time would send
+    """
+    rng = random.Random(seed)
+    return [sentence[:length] for sentence in rng.sample(sentences, min(queries, len(sentences)))
+            for length in range(len(sentence) + 1)]
+
+def measure_batch(built, prompts):
+    """
+    Function description : Times answering prompts with one autoComplete call per prompt and with a single autoComplete_many,
+                           which answers repeated prompts once and walks prefixes shared by sorted prompts once
+    """
+    gc.collect()
+    start = time.perf_counter()
+    for prompt in prompts:
+        built.autoComplete(prompt)
+    loop = time.perf_counter() - start
+
+    gc.collect()
+    start = time.perf_counter()
+    built.autoComplete_many(prompts)
+    batched = time.perf_counter() - start
+    return {"prompts": len(prompts), "distinct": len(set(prompts)), "loop_seconds": loop, "seconds": batched,
+            "prompts_per_second": len(prompts) / batched if batched else 0.0,
+            "speedup": loop / batched if batched else 0.0}
+
+def measure_lookups(built, prompts, typed):
+    """
+    Function description : Times every autoComplete call and returns latency percentiles for each prompt length, and the
+                           time of answering all prompts, and every prefix of the typed prompts, through a loop of 
+                           autoComplete against autoComplete_many
+    """
+    by_length = {}
+    every = []
+    for length, group in prompts.items():
+        samples = []
+        for prompt in group:
+            start = time.perf_counter_ns()
+            built.autoComplete(prompt)
+            samples.append(time.perf_counter_ns() - start)
+        by_length[str(length)] = percentiles(samples)
+        every.extend(group)
+
+    return {"autoComplete_us": by_length,
+            "autoComplete_many": measure_batch(built, every),
+            "autoComplete_many_typed": measure_batch(built, typed)}
+
+def run(size=100000, queries=2000, max_prompt=8, repeats=3, seed=0, corpora=tuple(CORPORA), options=None):
+    """
+    Function description : Runs the build and lookup benchmarks on every corpus in corpora and returns the results as a
+                           dictionary. The same size and seed give the same corpora and prompts, so runs are comparable.
+                           options are passed on to CatsTrie, like top_k_size or radix.
+    """
+    trie = load_trie()
+    options = options or {}
+    results = {"python": platform.python_version(), "platform": platform.platform(),
+               "size": size, "queries": queries, "repeats": repeats, "seed": seed, "options": options, "corpora": {}}
+    for name in corpora:
+        sentences = CORPORA[name](size, seed=seed)
+        built, build = measure_build(trie, sentences, repeats, **options)
+        prompts = lookup_prompts(sentences, queries, max_prompt, seed)
+        typed = prefix_prompts(sentences, queries, seed)
+        results["corpora"][name] = {"distinct": len(set(sentences)), "build": build,
+                                    "lookup": measure_lookups(built, prompts, typed)}
+        del built
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark CatsTrie build throughput, lookup latency and memory")
+    parser.add_argument("--size", type=int, default=100000, help="sentences in every corpus")
+    parser.add_argument("--queries", type=int, default=2000, help="prompts of every length")
+    parser.add_argument("--max-prompt", type=int, default=8, help="longest prompt length")
+    parser.add_argument("--repeats", type=int, default=3, help="builds timed, the best is reported")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="corpus to run, all by default")
+    parser.add_argument("--top-k", type=int, default=10, help="top_k_size of the Tries")
+    parser.add_argument("--radix", action="store_true", help="benchmark RadixCatsTrie")
+    parser.add_argument("--output", help="file to write the JSON to, standard output by default")
+    args = parser.parse_args()
+
+    results = run(args.size, args.queries, args.max_prompt, args.repeats, args.seed, args.corpus or tuple(CORPORA),
+                  {"top_k_size": args.top_k, "radix": args.radix})
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text + "\n")
+    else:
+        print(text)
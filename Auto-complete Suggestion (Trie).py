@@ -1,19 +1,81 @@
+from array import array  # flat typed columns for CompactCatsTrie and saved tries
+import asyncio  # for AutoCompleteServer
+from bisect import bisect_left  # to search the sorted child labels of MappedCatsTrie
+from concurrent.futures import ProcessPoolExecutor  # to build the shards of a ShardedCatsTrie in parallel
+from collections import OrderedDict, deque  # LRU cache of autoComplete results and recent server latencies
+from contextlib import contextmanager  # for gc_paused
+import gc  # to pause garbage collection while building
+from heapq import heapify, heappop, heappush  # best first search of autoComplete_fuzzy and eviction order
+import io  # to build the saved form in memory
+import json  # responses of AutoCompleteServer
+import mmap  # to map saved tries without reading them
+import os  # path of this script for the workers of build_parallel
+import math  # for logarithms of decayed scores
+import struct  # to pack the saved header
+import sys  # to check the byte order
+import time  # to report construction throughput
+
 class TrieNode:
     """
     Class Description : This class implements the node of a Trie and stores additional information like :
                         Terminator - indicating end of a sentence, used boolean instead of $ 
                         Freq - frequency, the amount of times sentence exist in sentences
+                        Sentence - the sentence that ends at this node, so it never has to be rebuilt from the path
+                        Best - the terminal node of the best sentence (highest freq, then lexicographically smallest)
+                               found anywhere in this node's subtree, kept up to date by insert
+                        Top - the K best terminal nodes of this node's subtree in ranked order, kept up to date by insert
+                        Count / Weight - the number of distinct sentences and the sum of their frequencies in this node's 
+                                         subtree, kept up to date by insert
+                        Score - what suggestions are ranked by, the frequency or a time-decayed version of it
+                        Child - a list with one slot per alphabet character, or a dictionary from character to child when
+                                the Trie has no fixed alphabet
     """
-    def __init__(self):
-        self.child = [None] * 26
+    def __init__(self, slots=26):
+        self.child = [None] * slots if slots else {}
         self.freq = 0
         self.terminator = False
+        self.sentence = None        ### the sentence ending at this node, only set when terminator is True
+        self.score = 0              ### ranking score of the sentence, freq itself unless the Trie decays frequencies
+        self.best = None            ### terminal TrieNode holding the best sentence in this node's subtree
+        self.top = []               ### up to K terminal TrieNodes of this node's subtree, best first
+        self.count = 0              ### number of distinct sentences in this node's subtree
+        self.weight = 0             ### sum of the frequencies of the sentences in this node's subtree
+
+LOWERCASE = "abcdefghijklmnopqrstuvwxyz"
+DENSE_ALPHABET_LIMIT = 64       ### largest alphabet whose nodes keep one child slot per character
+
+def shared_length(text, other):
+    """
+    Function description : Returns the number of leading characters text shares with other, where text is sorted after other 
+                           and doesn't start with it, so they differ at some character before either ends and comparing one 
+                           character at a time needs no bound check
+
+    Time complexity : O(L), where L is the number of characters shared
+    """
+    shared = 0
+    while text[shared] == other[shared]:
+        shared += 1
+    return shared
 
 class CatsTrie:
     """
     Class Description : Initialise and constructing Trie Structure according to sentences
+
+                        The characters sentences may use are given by alphabet. A small alphabet of at most DENSE_ALPHABET_LIMIT
+                        characters, like the default lowercase letters, gives every node a list with one slot per character, 
+                        found by its index in the sorted alphabet. A larger alphabet, like string.printable or CJK text, or 
+                        alphabet None which allows any character, gives every node a dictionary of only the children it has,
+                        so memory doesn't grow with the number of possible characters. Children are visited in sorted 
+                        character order either way, so ties still go to the lexicographically smaller sentence.
     """
-    def __init__(self, sentences):
+    def __new__(cls, *args, radix=False, **kwargs):
+        """ CatsTrie(sentences, radix=True) constructs the path-compressed RadixCatsTrie instead """
+        if radix and not issubclass(cls, RadixCatsTrie):
+            cls = RadixCatsTrie
+        return super().__new__(cls)
+
+    def __init__(self, sentences, top_k_size=10, radix=False, alphabet=LOWERCASE, max_nodes=None, half_life=None, clock=time.time,
+                 cache_size=0):
         """
         Function Description : takes in a list of sentence (strings) and construct the Trie stucture to include every string in the sentences list
 
@@ -25,6 +87,17 @@ class CatsTrie:
 
                                 Input : 
                                     sentences = a list of sentences (strings) to be added to the Trie
+                                    top_k_size = K, the number of ranked suggestions every node keeps for top_k, 0 disables the lists
+                                    radix = True to build a path-compressed RadixCatsTrie
+                                    alphabet = string of the characters sentences may use, None for any character. Nodes 
+                                               keep dense child lists for up to DENSE_ALPHABET_LIMIT characters and 
+                                               dictionaries beyond
+                                    max_nodes = optional budget of nodes, the lowest ranked sentences are evicted to stay 
+                                                within it, least recently used first among equal scores
+                                    half_life = optional time after which a use counts half as much in the ranking, in the 
+                                                unit of clock, None to rank by all-time frequency
+                                    clock = function returning the current time, seconds since the epoch by default
+                                    cache_size = number of autoComplete results kept in an LRU cache, 0 for no cache
 
                                 Time Complexity Explanation :
                                     O(NM) - Insert each character which cost O(M) for each sentence O(N)
@@ -35,55 +108,563 @@ class CatsTrie:
         Time complexity : O(NM), where N is number of sentence in sentences and M is number of characters in the longest sentence
         Aux Space complexity : O(NM), where N is number of sentence in sentences and M is number of characters in the longest sentence
         """
+        if top_k_size < 0:
+            raise ValueError("top_k_size must not be negative")
+        self.top_k_size = top_k_size                   ### K, length of every node's ranked suggestion list
+
+        # sorted alphabet and the index of each character in it, both None when any character is allowed
+        # indices checks sentences against the alphabet and, for a dense alphabet, gives each character its slot in the child lists
+        self.alphabet = None if alphabet is None else "".join(sorted(set(alphabet)))
+        self.indices = None if alphabet is None else {char: index for index, char in enumerate(self.alphabet)}
+        self.dense = alphabet is not None and len(self.alphabet) <= DENSE_ALPHABET_LIMIT
+
+        # node budget and counters, the eviction heap is only kept when there is a budget
+        if max_nodes is not None and max_nodes < 1:
+            raise ValueError("max_nodes must be at least 1 for the root")
+        self.max_nodes = max_nodes
+        self.node_count = 0                            ### current footprint in nodes, including the root
+        self.evictions = 0                             ### number of sentences evicted to stay within max_nodes
+        self.eviction_heap = []
+        self.order = 0
+
+        # exponential decay of scores, rate is per unit of time and scores are measured from the time the Trie was created
+        if half_life is not None and half_life <= 0:
+            raise ValueError("half_life must be positive")
+        self.half_life = half_life
+        self.decay_rate = 0.0 if half_life is None else math.log(2) / half_life
+        self.clock = clock
+        self.epoch = clock()
+
+        # LRU cache of prompt to (result, node of prompt), and the cached prompts of every node to invalidate them
+        if cache_size < 0:
+            raise ValueError("cache_size must not be negative")
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_index = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.cache_evictions = 0
+
         self.root = self.getNode()                     ### Create root node
     
         # Insert every sentence in sentences into Trie - O(NM) 
         for sentence in sentences:
             self.insert(sentence)                      ### inserting a sentence cost O(M)
 
+    @classmethod
+    def from_iterable(cls, sentences, progress=None, progress_every=100000, **options):
+        """
+        Function description : Constructs a CatsTrie from any iterable of sentences, like a generator, without holding them in a 
+                               list. Items are either a sentence or a (sentence, count) tuple for pre-aggregated input, so 
+                               peak memory is the Trie itself plus the item being inserted.
+
+                                Input :
+                                    sentences = iterable of sentences or (sentence, count) tuples
+                                    progress = optional function called as progress(items, seconds, items_per_second) after 
+                                               every progress_every items and once at the end
+                                    progress_every = number of items between progress calls
+                                    options = keyword options of CatsTrie, like top_k_size, radix, alphabet or max_nodes
+
+        Time complexity : O(NMK), where N is number of items, M is number of characters in the longest sentence and K is top_k_size
+        Aux Space complexity : O(1), on top of the Trie
+        """
+        if progress_every < 1:
+            raise ValueError("progress_every must be at least 1, got " + str(progress_every))
+        trie = cls([], **options)
+        started = time.perf_counter()
+        items = 0
+
+        for item in sentences:
+            if isinstance(item, str):
+                trie.insert(item)
+            else:
+                sentence, count = item
+                trie.insert(sentence, count)
+
+            items += 1
+            if progress is not None and items % progress_every == 0:
+                seconds = time.perf_counter() - started
+                progress(items, seconds, items / seconds if seconds else 0.0)
+
+        if progress is not None:
+            seconds = time.perf_counter() - started
+            progress(items, seconds, items / seconds if seconds else 0.0)
+        return trie
+
+    @classmethod
+    def from_file(cls, path, counted=False, encoding="utf-8", **options):
+        """
+        Function description : Constructs a CatsTrie from a text file with one sentence per line, reading it line by line.
+                               With counted, every line is "sentence<TAB>count" where count is the number of times the sentence 
+                               was used. Empty lines are skipped. Other keyword options are passed to from_iterable.
+
+        Time complexity : O(NMK), where N is number of lines, M is number of characters in the longest sentence and K is top_k_size
+        Aux Space complexity : O(M), for the line being read
+        """
+        with open(path, encoding=encoding) as file:
+            return cls.from_iterable(read_sentences(file, counted), **options)
+
+    @classmethod
+    def build_parallel(cls, sentences, workers=None, top_k_size=10, alphabet=LOWERCASE, **options):
+        """
+        Function description : Builds a read-only ShardedCatsTrie of sentences using a pool of worker processes, not a CatsTrie.
+                               It only answers autoComplete, autoComplete_many and top_k, the same as 
+                               CatsTrie(sentences, top_k_size, alphabet=alphabet) would, and has no insert, record_usage, 
+                               prefix_count, session, autoComplete_fuzzy or save. Use the constructor or from_iterable for a 
+                               Trie that keeps changing.
+
+        Approach description : Sentences starting with different characters never share a node below the root, so the sentences 
+                               are split into one shard per first character. Each worker process builds the CatsTrie of a shard 
+                               and sends it back in the binary form of save, which is a single bytes object instead of a pickled 
+                               tree of nodes. The main process keeps every shard in that form and only ranks the shards' root 
+                               top K lists for the empty prompt, so no node is rebuilt and the build scales with the workers up 
+                               to the number of distinct first characters.
+
+                               The shards are read-only, so the options needing to change the Trie after the build, max_nodes,
+                               half_life, cache_size and radix, are rejected with ValueError unless left at their defaults.
+
+                               This script is usually loaded from its path rather than imported by name, so worker processes 
+                               started with spawn or forkserver couldn't find build_shard. Every worker first runs 
+                               SHARD_LOADER, which loads the script from the same path under the same module name, so any 
+                               start method works.
+
+                                Input :
+                                    sentences = a list of sentences (strings) to be added to the Trie
+                                    workers = number of worker processes, the number of CPUs if None
+                                    top_k_size, alphabet = as for CatsTrie
+
+        Time complexity : O(NM / W + SK log SK), where N is number of sentence in sentences, M is number of characters in the 
+                          longest sentence, W the number of workers, S the number of shards and K is top_k_size
+        Aux Space complexity : O(NM), for the shards and their binary forms
+        """
+        defaults = {"radix": False, "max_nodes": None, "half_life": None, "cache_size": 0}
+        if issubclass(cls, RadixCatsTrie):
+            options.setdefault("radix", True)
+        for name, value in options.items():
+            if name not in defaults:
+                raise TypeError("build_parallel() got an unexpected keyword argument " + repr(name))
+            if value != defaults[name]:
+                raise ValueError("build_parallel builds a read-only ShardedCatsTrie and doesn't support " + name)
+
+        # Split sentences by first character - O(N)
+        shards = {}
+        empty = 0
+        for sentence in sentences:
+            if sentence:
+                shards.setdefault(sentence[0], []).append(sentence)
+            else:
+                empty += 1
+
+        # largest shards first so no worker is left with a big one at the end
+        chars = sorted(shards, key=lambda char: len(shards[char]), reverse=True)
+        loader = {"name": __name__, "path": os.path.abspath(__file__)}
+        with ProcessPoolExecutor(max_workers=workers, initializer=exec, initargs=(SHARD_LOADER, loader)) as pool:
+            built = pool.map(build_shard, [shards[char] for char in chars], [top_k_size] * len(chars), [alphabet] * len(chars))
+            return ShardedCatsTrie(dict(zip(chars, built)), empty, top_k_size)
+
     def getNode(self,):
         """
         Function description : Creates a TrieNode object including initialising its details
 
+        Time complexity : O(A), where A is the size of a dense alphabet, O(1) with dictionary children
+        """
+        self.node_count += 1
+        return TrieNode(len(self.alphabet) if self.dense else 0)
+
+    def getChild(self, node, char):
+        """
+        Function description : Returns the child of node for character char, None if there is none
+
         Time complexity : O(1), constant time complexity
         """
-        return TrieNode()
+        if not self.dense:
+            return node.child.get(char)
+        index = self.indices.get(char)
+        if index is None:
+            return None                         ### not in the alphabet so no sentence can continue with it
+        return node.child[index]
 
-    def toIndex(self, c):
-        """ 
-        Function description : Turns a character to it's corresponding number representative using ASCII value
+    def setChild(self, node, char, child):
         """
-        return ord(c) - ord("a")
-    
-    def toChar(self, n):
-        """ 
-        Function description : Turns a number to it's corresponding lowercase character using ASCII value 
+        Function description : Makes child the child of node for character char
+
+        Time complexity : O(1), constant time complexity
         """
-        return chr(ord('a') + n )
+        if self.indices is not None and char not in self.indices:
+            raise ValueError(repr(char) + " is not in the alphabet of this CatsTrie")
+        if self.dense:
+            node.child[self.indices[char]] = child
+        else:
+            node.child[char] = child
 
-    def insert(self, sentence):
+    def checkCount(self, count):
+        """
+        Function description : Raises ValueError if count is below 1, checked before inserting as the cached best and top K 
+                               are only correct while frequencies increase
+        """
+        if count < 1:
+            raise ValueError("count must be at least 1, got " + str(count))
+
+    def checkAlphabet(self, sentence):
+        """
+        Function description : Raises ValueError if sentence uses a character outside the alphabet, checked before inserting so 
+                               a rejected sentence leaves no nodes behind
+
+        Time complexity : O(M), where M is number of characters in sentence
+        """
+        if self.indices is not None:
+            for char in sentence:
+                if char not in self.indices:
+                    raise ValueError(repr(char) + " in " + repr(sentence) + " is not in the alphabet of this CatsTrie")
+
+    def labelled_children(self, node):
+        """
+        Function description : Returns an iterator of (character, child) pairs for the existing children of node in sorted order 
+                               of their characters
+
+        Time complexity : O(A) for the whole iteration with a dense alphabet of size A, O(C log C) with dictionary children, where 
+                          C is the number of children of node
+        """
+        if not self.dense:
+            return iter(sorted(node.child.items()))
+        return ((self.alphabet[index], child) for index, child in enumerate(node.child) if child is not None)
+
+    def insert(self, sentence, count=1):
         """
         Function description : Iterates over each character in sentences and create a node if the child node
                                does no exist. It then moves to the next child node and update the current node.
+                               The frequency of sentence increases by count, 1 for a single use.
+
+        Approach description : Every node visited on the way down is remembered in path. Once the terminal node's frequency is
+                               increased, each node on the path compares its cached best sentence with the inserted one and takes
+                               the inserted sentence if it is now better. Frequencies only ever increase, so the inserted sentence is 
+                               the only one whose rank can change and comparing against it alone keeps every cached best correct.
+                               For the same reason each node's top K list only needs the inserted sentence moved up, or added 
+                               if it now beats the last entry.
 
-        Time complexity : O(M), where M is number of characters in the longest sentence
+        Time complexity : O(MK), where M is number of characters in the longest sentence and K is top_k_size
+        Aux space complexity : O(M), for the path of visited nodes
         """
+        self.checkCount(count)
+        self.checkAlphabet(sentence)
         node = self.root                           ### start at root node
+        path = [node]                              ### every node whose subtree contains sentence
 
         # to check child node for each character in the sentence - O(M)
-        for char in range(len(sentence)):
-            index = self.toIndex(sentence[char])   ### change character to ASCII numeric value to get index of where to find node
+        for char in sentence:
+            child = self.getChild(node, char)
 
             # checks if child node exists, if not, create a new node
-            if not node.child[index]:
-                node.child[index] = self.getNode() 
+            if child is None:
+                child = self.getNode()
+                self.setChild(node, char, child)
             
-            node = node.child[index]               ### set current node to child node to traverse down Trie to check next character
-        
+            node = child                           ### set current node to child node to traverse down Trie to check next character
+            path.append(node)
+
+        self.finishInsert(path, sentence, count)
+
+    def finishInsert(self, path, sentence, count):
+        """
+        Function description : Marks the last node of path as the end of sentence and increases its frequency by count, then 
+                               updates the scores, subtree statistics and caches of path and enforces the node budget. Shared 
+                               by every insert once it has walked or created the nodes of sentence.
+
+        Time complexity : O(MK), where M is the length of path and K is top_k_size
+        """
+        node = path[-1]
+
         # After the sentence is inserted, sets terminator to True to indicate end of sentence
         node.terminator = True
+        node.sentence = sentence
         # Keeps track of frequency to see how often the sentence is used
-        node.freq += 1
+        node.freq += count
+        self.addScore(node, count)
+        self.updateStats(path, count, node.freq == count)
+
+        # Update the cached best sentence and top K list of every node above the inserted sentence - O(MK)
+        self.updateCaches(path, node)
+
+        # Evict the lowest ranked sentences if the new nodes went over budget
+        if self.max_nodes is not None:
+            self.enforceBudget(node)
+
+    def record_usage(self, sentence, count=1):
+        """
+        Function description : Records that sentence was used count more times, adding it if it is new. The frequency changes
+                               right away together with the cached best and top K of the nodes on sentence's path, so the Trie 
+                               never has to be rebuilt to absorb new usage.
+
+        Input :
+                sentence = the sentence that was used
+                count = positive number of new uses
+
+        Time complexity : O(MK), where M is number of characters in sentence and K is top_k_size
+        """
+        self.insert(sentence, count)
+
+    def record_usages(self, events):
+        """
+        Function description : Applies a batch of usage events, each either a sentence or a (sentence, count) tuple.
+
+        Approach description : Counts of the same sentence are added up first, so every distinct sentence in the batch walks its
+                               path and updates the caches on it only once, however many times it appears in events.
+
+        Time complexity : O(E + UMK), where E is the number of events, U the number of distinct sentences in events,
+                          M the number of characters in the longest of them and K is top_k_size
+        Aux space complexity : O(U), for the counts of distinct sentences
+        """
+        counts = {}
+        for event in events:
+            if isinstance(event, str):
+                sentence, count = event, 1
+            else:
+                sentence, count = event
+            counts[sentence] = counts.get(sentence, 0) + count
+
+        for sentence, count in counts.items():
+            self.insert(sentence, count)
+
+    def updateCaches(self, path, terminal):
+        """
+        Function description : After the frequency of terminal increased, updates the cached best sentence and top K list 
+                               of every node in path, the nodes whose subtree contains terminal.
+
+        Time complexity : O(PK), where P is the length of path and K is top_k_size
+        """
+        for visited in path:
+            if self.isBetter(terminal, visited.best):
+                visited.best = terminal
+            self.updateTop(visited.top, terminal)
+
+        # the result of a cached prompt can only change if its node is on the path
+        if self.cache:
+            for visited in path:
+                self.invalidate(visited)
+
+    def updateStats(self, path, count, new):
+        """
+        Function description : Adds count uses to the weight of every node in path, the path of a sentence, and one more distinct 
+                               sentence to their count if the sentence is new
+
+        Time complexity : O(P), where P is the length of path
+        """
+        for visited in path:
+            visited.weight += count
+            if new:
+                visited.count += 1
+
+    def invalidate(self, node):
+        """
+        Function description : Removes the cached autoComplete results of the prompts ending at node
+
+        Time complexity : O(P), where P is the number of cached prompts ending at node
+        """
+        prompts = self.cache_index.pop(node, None)
+        if prompts is not None:
+            for prompt in prompts:
+                del self.cache[prompt]
+
+    def updateTop(self, top, node):
+        """
+        Function description : Moves terminal node to its ranked position in the top list after its frequency increased. 
+                               If node is not in the list yet, it is added when there is room or when it beats the last entry, 
+                               which is then dropped to keep the list at K entries.
+
+        Time complexity : O(K), where K is top_k_size
+        """
+        if node in top:
+            position = top.index(node)
+        elif len(top) < self.top_k_size:
+            top.append(node)
+            position = len(top) - 1
+        elif self.top_k_size > 0 and self.isBetter(node, top[-1]):
+            top[-1] = node                  ### replaces the worst entry, list stays at K entries
+            position = len(top) - 1
+        else:
+            return
+
+        # Rise node towards the front while it ranks higher than the entry before it
+        while position > 0 and self.isBetter(node, top[position - 1]):
+            top[position], top[position - 1] = top[position - 1], top[position]
+            position -= 1
+
+    def isBetter(self, node, other):
+        """
+        Function description : Returns True if terminal node should be suggested before terminal other, meaning it has a higher
+                               score or, for the same score, a lexicographically smaller sentence. Any node is better than None.
+                               The score is the frequency unless the Trie has a half_life.
+
+        Time complexity : O(M), where M is number of characters in the longest sentence, from comparing sentences on a tie
+        """
+        if other is None:
+            return True
+        if node.score != other.score:
+            return node.score > other.score
+        return node.sentence < other.sentence
+
+    def rankKey(self, node):
+        """
+        Function description : Returns a sort key of terminal node, sorting in the order suggestions are ranked by isBetter
+
+        Time complexity : O(1), constant time complexity
+        """
+        return (-node.score, node.sentence)
+
+    def addScore(self, node, count):
+        """
+        Function description : Adds count uses made now to the score of terminal node
+
+        Approach description : Decaying every score as time passes would mean visiting every node. Instead each use is weighted 
+                               by exp(rate * t), t being the time of the use since the Trie was created, so newer uses weigh 
+                               more. The decayed frequency at any time now is the sum of these weights divided by 
+                               exp(rate * now), and as that divisor is the same for every sentence, ranking by the sums 
+                               ranks by decayed frequency without ever touching old scores. Scores only grow, which keeps
+                               the cached best and top K correct exactly as with plain frequencies.
+
+                               The weights grow without bound, so the score is kept as the logarithm of the sum, adding
+                               log(count) + rate * t to it with a log-sum-exp that cannot overflow.
+
+        Time complexity : O(1), constant time complexity
+        """
+        if self.half_life is None:
+            node.score = node.freq
+            return
+
+        weight = math.log(count) + self.decay_rate * (self.clock() - self.epoch)
+        if node.freq == count:
+            node.score = weight                         ### first use of the sentence
+        else:
+            high, low = max(node.score, weight), min(node.score, weight)
+            node.score = high + math.log1p(math.exp(low - high))
+
+    def decayed_frequency(self, sentence):
+        """
+        Function description : Returns the frequency of sentence with every use decayed by half per half_life up to now, 
+                               the plain frequency if the Trie doesn't decay, and 0 if sentence is not in the Trie
+
+        Time complexity : O(M), where M is number of characters in sentence
+        """
+        cursor = self.walk(self.start_cursor(), sentence)
+        terminal = None if cursor is None else self.cursor_terminal(cursor)
+        if terminal is None:
+            return 0
+        if self.half_life is None:
+            return terminal.freq
+        return math.exp(terminal.score - self.decay_rate * (self.clock() - self.epoch))
+
+    def enforceBudget(self, terminal):
+        """
+        Function description : Called after the frequency of terminal changed in a Trie with a max_nodes budget. Records the new 
+                               score in the eviction heap, then evicts the lowest ranked sentences until the Trie fits in 
+                               max_nodes again.
+
+        Approach description : The heap holds (score, order, terminal) entries pushed on every frequency change, order being 
+                               a running number so equal scores evict the least recently used sentence first. Entries are 
+                               not removed when the score changes again, instead an entry whose score no longer matches its 
+                               terminal is skipped when popped. Once stale entries make up most of the heap it is rebuilt from 
+                               the live entries only, so the heap stays proportional to the Trie.
+
+        Time complexity : O(log H + E(M + MA + MK log CK)), where H is the heap size, E the number of evicted sentences, and per
+                          eviction M is the length of the sentence, A the size of the alphabet, C the largest number of 
+                          children and K is top_k_size, from pruning and repairing the path
+        """
+        self.order += 1
+        heappush(self.eviction_heap, (terminal.score, self.order, terminal))
+
+        while self.node_count > self.max_nodes and self.eviction_heap:
+            score, order, lowest = heappop(self.eviction_heap)
+            if lowest.terminator and lowest.score == score:
+                self.evict(lowest)
+
+        # rebuild the heap without stale entries - O(H), amortised over the H / 2 pushes since the last rebuild
+        if len(self.eviction_heap) > 2 * self.node_count + 64:
+            self.eviction_heap = [entry for entry in self.eviction_heap if entry[2].terminator and entry[2].score == entry[0]]
+            heapify(self.eviction_heap)
+
+    def evict(self, terminal):
+        """
+        Function description : Removes the sentence ending at terminal from the Trie, removes the nodes no other sentence needs 
+                               and repairs the cached best and top K of the nodes left on its path.
+
+        Approach description : Only the ancestors of terminal had it in their subtree, so only their caches can refer to it. 
+                               After pruning, each remaining ancestor is rebuilt from the bottom up out of its own sentence 
+                               and its children's caches, which are already correct as they are either off the path or 
+                               rebuilt just before.
+
+        Time complexity : O(M + MA + MK log CK), where M is the length of the sentence, A the size of the alphabet, C the 
+                          largest number of children and K is top_k_size
+        """
+        sentence = terminal.sentence
+        path = self.findPath(sentence)
+        for node in path:
+            node.count -= 1
+            node.weight -= terminal.freq
+
+        terminal.terminator = False
+        terminal.freq = 0
+        terminal.score = 0
+        terminal.sentence = None
+        self.evictions += 1
+        for node in path:
+            self.invalidate(node)
+
+        # remove nodes left without sentences, then repair the caches of the rest from the bottom up
+        path = self.prune(path, sentence)
+        for node in reversed(path):
+            self.repairNode(node)
+
+    def findPath(self, sentence):
+        """
+        Function description : Returns the list of nodes from the root to the terminal node of sentence, which must be in the Trie
+
+        Time complexity : O(M), where M is number of characters in sentence
+        """
+        path = [self.root]
+        for char in sentence:
+            path.append(self.getChild(path[-1], char))
+        return path
+
+    def prune(self, path, sentence):
+        """
+        Function description : Removes the nodes at the end of path, the path of sentence which was just evicted, that have no 
+                               sentence ending at them or below them, and returns the part of path that is left
+
+        Time complexity : O(MA), where M is number of characters in sentence and A the size of the alphabet
+        """
+        depth = len(path) - 1
+        while depth > 0 and not path[depth].terminator and next(self.labelled_children(path[depth]), None) is None:
+            self.removeChild(path[depth - 1], sentence[depth - 1])
+            self.node_count -= 1
+            depth -= 1
+        return path[:depth + 1]
+
+    def removeChild(self, node, char):
+        """
+        Function description : Removes the child of node for character char
+
+        Time complexity : O(1), constant time complexity
+        """
+        if self.dense:
+            node.child[self.indices[char]] = None
+        else:
+            del node.child[char]
+
+    def repairNode(self, node):
+        """
+        Function description : Recomputes the cached best and top K of node from its own sentence and the caches of its children,
+                               for when a sentence below it was removed
+
+        Time complexity : O(A + CK log CK), where A the size of the alphabet, C the number of children of node and K is top_k_size
+        """
+        candidates = [node] if node.terminator else []
+        best = node if node.terminator else None
+        for child in self.children(node):
+            candidates.extend(child.top)
+            if child.best is not None and self.isBetter(child.best, best):
+                best = child.best
+        node.best = best
+        node.top = sorted(candidates, key=self.rankKey)[:self.top_k_size]
 
     def autoComplete(self, prompt):
         """
@@ -91,94 +672,1632 @@ class CatsTrie:
                                completed sentence / best word to use for auto-complete from prompt
 
         Approach description : After having a Trie structure with all sentences inserted. We can traverse Trie according to prompt to check it's existence.
-                               If the prompt does not exist, getting the node's child index when traversing will return None when the character at it's intended 
-                               index is not found. It will return None right way without running the rest of the function.
-
-                               After confirming it's existence, find_best_sentence returns the best word to be used for auto-complete.
-                               This is by traversing every possible sentence starting with prompt, which is all nodes under the last character in prompt's node
-                               in lexicographic order.
+                               If the prompt does not exist, getChild will return None when traversing reaches a character the node has no child for,
+                               including characters outside the alphabet. It will return None right way without running the rest of the function.
 
-                               Because it traverses in lexicographically order and only updates when frequency is higher, it ensures that even when frequency is 
-                               the same, the best word will still be the most lexicographically smaller one.
+                               After confirming it's existence, the node of the last character in prompt already holds the best sentence of its subtree,
+                               which is every sentence starting with prompt. insert keeps this cached best up to date, so no traversal of the subtree 
+                               is needed and short prompts cost as little as long ones.
 
-                               It will eventually return the word with the highest frequency or in cases where they have the same frequency it will return
+                               It will return the word with the highest frequency or in cases where they have the same frequency it will return
                                the lexicographically smaller string
 
                                 Time complexity explanation :
-                                        Best : O(X) - in the best case where word does not exist, find_best_sentence is not ran, therefore complexity is just O(X)
-                                        Worst : O(X) - from checking existence, and then running find_best_sentence
+                                        Best : O(X) - in the best case where word does not exist, the walk stops early
+                                        Worst : O(X) - from checking existence, reading the cached best is constant time
 
                                 Input :
-                                        prompt = a string of characters from a to z representing the incomplete sentence to be completed
+                                        prompt = a string of characters representing the incomplete sentence to be completed, a character outside the 
+                                                 alphabet simply matches no sentence
 
                                 Output :
-                                        self.bestsentence = a string of the best word to be used as auto completed by Trie
+                                        a string of the best word to be used as auto completed by Trie, None if no sentence starts with prompt
 
-        Time complexity :   Best : O(X), where X is length of prompt and prompt doesn't exist in Trie
-                            Worst / Average : O(X + Y), where X is length of prompt and Y is the lenght of the most frequently used sentence in sentences 
-                                    that begins with prompt 
+        Time complexity :   O(X), where X is length of prompt
         Aux space Complexity : O(1), in-place 
         """
-        node = self.root                        ### start at root node
+        if prompt in self.cache:
+            self.cache_hits += 1
+            self.cache.move_to_end(prompt)
+            return self.cache[prompt][0]
 
         # Check existence of prompt by traversing Trie according to each character in prompt - O(X)
-        for char in prompt:
-            index = self.toIndex(char)          ### change character to ASCII numeric value to get index of where to find node
+        node = self.find_node(prompt)
 
-            # If at some point, the node doesn't have a child of next character in prompt
-            if not node.child[index]:
-                return None                     ### Prompt doesn't exist
-        
-            node = node.child[index]            ### set current node to child node to traverse down Trie to check next character
+        # Return the best sentence to be used for auto-complete
+        result = self.suggestion(node)
+        if self.cache_size:
+            self.cache_misses += 1
+            if node is not None:
+                self.remember(prompt, result, node)
+        return result
+
+    def remember(self, prompt, result, node):
+        """
+        Function description : Adds the autoComplete result of prompt, whose node is node, to the LRU cache, evicting the least 
+                               recently used result if the cache is full. Results are indexed by node so an update touching node 
+                               invalidates exactly the prompts ending there. Prompts that don't exist are not cached, as any 
+                               insert could create them.
 
-        # Initialisation to keep track of the best sentence to be used for auto-complete
-        self.bestsentence = ""                  ### best sentence to be used 
-        self.bestfreq = 0                       ### frequency of the current best sentence
-        self.bestlength = 0                     ### length of current best sentence
+        Time complexity : O(1), constant time complexity
+        """
+        if len(self.cache) >= self.cache_size:
+            oldest, (oldest_result, oldest_node) = self.cache.popitem(last=False)
+            prompts = self.cache_index[oldest_node]
+            prompts.discard(oldest)
+            if not prompts:
+                del self.cache_index[oldest_node]
+            self.cache_evictions += 1
 
-        # After confirming existence of word, perform find_best_sentence to find all words with the given prompt and pick the best sentence - O(Y)
-        self.find_best_sentence(node, prompt)
-        
-        # Return the best sentence to be used for auto-complete
-        return self.bestsentence
+        self.cache[prompt] = (result, node)
+        self.cache_index.setdefault(node, set()).add(prompt)
 
-    def find_best_sentence(self, node, word):
+    def cache_stats(self):
         """
-        Function description : recursively traverse Trie from given node according to each char in prompt and update the 
-                               best sentence information based on frequency
+        Function description : Returns a dictionary of the LRU cache counters : hits, misses, evictions and current size
 
-        Approach description : If a node terminator is reached while traversing Trie according to prompt, the current sentence exist in sentences. 
-                               It then compares the current sentence and the best recorded sentence up to that point using it's frequency and 
-                               always pick the highest, in the case where they have the same frequency, it will update if current sentence is 
-                               lexicographically smaller. It will continue calling itself until there is no more sentence in sentences starting 
-                               with prompt that isn't checked. 
+        Time complexity : O(1), constant time complexity
+        """
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "evictions": self.cache_evictions, "size": len(self.cache)}
+
+    def suggestion(self, node):
+        """
+        Function description : Returns the cached best sentence of node, None if node is None because the prompt doesn't exist.
 
-                               This way all potential sentences to be used as auto-complete is checked and the best is picked.
+        Time complexity : O(1), constant time complexity
+        """
+        if node is None:
+            return None                         ### Prompt doesn't exist
 
-                               Note : word is used to represent current sentence throughout this function
+        # Only an empty Trie has a node without a best sentence
+        if node.best is None:
+            return ""
+        return node.best.sentence
 
-        Time complexity : O(Y), where Y is the length of the most frequently used sentence in sentences that begins with prompt 
-                                unless it doesn't exist
+    def autoComplete_many(self, prompts):
         """
-        # If terminator is true, it means the current sentence exist in sentences meaning it could be a candidate
-        if node.terminator:
-            frequency = node.freq                   ### frequency : number of times current word appeared in sentences
+        Function description : Returns a list with the autoComplete result of every prompt in prompts, in the same order.
 
-            # If current sentence frequency is higher than the best sentence up to this point
-            # This also ensures it always picks the lexicographically smaller string because of the way the Trie is constructed
-            if node.freq > self.bestfreq:
-                # update the information with current word, current word is now the best sentence up to this point to be used for auto-complete
-                self.bestsentence = word
-                self.bestlength = len(word)
-                self.bestfreq = frequency
-
-        # Iterates all 26 character to ensure no nodes are missed out when traversing for node's child
-        for i in range(26):
-            # if a child exist for node
-            if node.child[i]:
-                char = self.toChar(i)               ### gets character of node's child
-                # Runs function again with current word and node's child character 
-                self.find_best_sentence(node.child[i], word + char)
+        Approach description : Repeated prompts are answered once, and the distinct prompts are visited in sorted order, so a 
+                               prompt comes right after the prompts sharing the most characters with it, like "pro" before 
+                               "prog" before "progr". path holds the node after every character of the previous prompt, so 
+                               the walk resumes from the node after the characters the two prompts share and only the 
+                               characters after them are walked, each shared prefix once instead of once per prompt.
+                               A prompt starting with the characters path holds carries on from the end of path after a single 
+                               startswith, otherwise path is cut back to the characters the two prompts share. A None at the 
+                               end of path means the previous prompt fell off the Trie there, and so does any prompt carrying on 
+                               from it. The child lookups of getChild are done inline, saving a call for every character.
+
+        Time complexity : O(P + U log U + T), where P is the number of prompts, U the number of distinct prompts and T the number 
+                          of characters not shared with the previous prompt in sorted order, at most the total length of prompts
+        Aux space complexity : O(U + X), for the answers and the path of the longest prompt
+        """
+        answers = dict.fromkeys(prompts)
+        dense = self.dense
+        indices = self.indices
+        path = [self.root]
+        previous = ""
+
+        for prompt in sorted(answers):
+            depth = len(path) - 1
+            if not prompt.startswith(previous[:depth]):
+                depth = shared_length(prompt, previous)
+                del path[depth + 1:]
+            node = path[-1]
+
+            # walk the characters after the shared ones, with the child lookups of getChild inline
+            if node is not None and dense:
+                for char in prompt[depth:]:
+                    index = indices.get(char)
+                    node = None if index is None else node.child[index]
+                    path.append(node)
+                    if node is None:
+                        break
+            elif node is not None:
+                for char in prompt[depth:]:
+                    node = node.child.get(char)
+                    path.append(node)
+                    if node is None:
+                        break
+
+            if node is None:
+                answers[prompt] = None          ### Prompt doesn't exist
+            else:
+                answers[prompt] = "" if node.best is None else node.best.sentence
+            previous = prompt
+
+        return [answers[prompt] for prompt in prompts]
+
+    def session(self, prompt=""):
+        """
+        Function description : Returns an AutoCompleteSession to follow a prompt typed one character at a time, starting from prompt
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        return AutoCompleteSession(self, prompt)
+
+    def start_cursor(self):
+        """
+        Function description : Returns a cursor for the empty prompt. A cursor marks how far a prompt has been walked into the
+                               Trie, and for CatsTrie it is simply the node of the prompt's last character.
+
+        Time complexity : O(1), constant time complexity
+        """
+        return self.root
+
+    def advance(self, cursor, char):
+        """
+        Function description : Returns the cursor after walking one more character char from cursor, None if the Trie has no
+                               sentence continuing with char.
+
+        Time complexity : O(1), constant time complexity
+        """
+        return self.getChild(cursor, char)
+
+    def walk(self, cursor, text):
+        """
+        Function description : Returns the cursor after walking every character of text from cursor, None if the Trie has no 
+                               sentence continuing with text.
+
+        Time complexity : O(T), where T is length of text
+        """
+        node = cursor
+        for char in text:
+            node = self.getChild(node, char)
+            if node is None:
+                return None
+        return node
+
+    def cursor_node(self, cursor):
+        """
+        Function description : Returns the node whose subtree holds every sentence starting with the prompt walked by cursor.
+
+        Time complexity : O(1), constant time complexity
+        """
+        return cursor
+
+    def autoComplete_fuzzy(self, prompt, max_edits):
+        """
+        Function description : Like autoComplete but tolerates typos, returning the best sentence that starts with any string 
+                               within max_edits insertions, deletions or substitutions of prompt, or None if there is none.
+
+        Approach description : Cursors are explored best first from a heap ordered by the cached best sentence of their node, 
+                               keeping for every cursor a row of the Levenshtein table : row[j] is the edit distance between the 
+                               characters walked so far and the first j characters of prompt. The row of a child is computed from
+                               its parent's row and the child's character.
+
+                               Once row[X] is within max_edits, the walked characters are a close enough prefix and every sentence 
+                               below matches. The node's cached best is then the answer, as every other cursor left in the heap, 
+                               and everything below them, has a best that ranks no higher. When the smallest value of a row exceeds
+                               max_edits, walking further can only add edits, so the branch is pruned.
+
+        Input :
+                prompt = a string of characters representing the incomplete sentence to be completed
+                max_edits = the largest number of edits allowed between prompt and the start of a suggestion
+
+        Time complexity : O(V(X + C log V)), where V is the number of cursors visited before a match, X is length of prompt and 
+                          C the largest number of children of a node
+        Aux space complexity : O(VX + VC), for the rows of visited cursors and the heap
+        """
+        root_best = self.cursor_node(self.start_cursor()).best
+        if root_best is None:
+            return None
+
+        # entries are the rank key of the cursor's best, then a unique number so cursors are never compared, the
+        # cursor, the row of its parent and its character, as most pushed cursors are never popped their row is 
+        # only computed when popped
+        heap = [(self.rankKey(root_best), 0, root_best, self.start_cursor(), None, None)]
+        pushed = 1
+
+        while heap:
+            key, number, best, cursor, row, char = heappop(heap)
+
+            # row of the Levenshtein table after walking char - O(X)
+            if row is None:
+                row = list(range(len(prompt) + 1))
+            else:
+                parent_row = row
+                row = [parent_row[0] + 1]
+                for j in range(1, len(parent_row)):
+                    row.append(min(parent_row[j] + 1, row[j - 1] + 1, parent_row[j - 1] + (prompt[j - 1] != char)))
+
+            # the walked characters match prompt within max_edits, nothing left in the heap ranks higher
+            if row[-1] <= max_edits:
+                return best.sentence
+
+            # no extension of the walked characters can get back within max_edits
+            if min(row) > max_edits:
+                continue
+
+            for char, child in self.cursor_children(cursor):
+                best = self.cursor_node(child).best
+                heappush(heap, (self.rankKey(best), pushed, best, child, row, char))
+                pushed += 1
+
+        return None
+
+    def prefix_count(self, prompt):
+        """
+        Function description : Returns the number of distinct sentences starting with prompt
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        node = self.find_node(prompt)
+        return 0 if node is None else node.count
+
+    def prefix_weight(self, prompt):
+        """
+        Function description : Returns the total frequency of the sentences starting with prompt, their total usage
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        node = self.find_node(prompt)
+        return 0 if node is None else node.weight
+
+    def top_k(self, prompt, k):
+        """
+        Function description : Returns a list of the k best sentences starting with prompt, best first, using the same ranking 
+                               as autoComplete. The list is shorter when fewer than k sentences start with prompt and empty 
+                               when prompt doesn't exist.
+
+        Approach description : Every node keeps its top K list up to date during insert, so after walking to the prompt's node 
+                               the answer is the front k entries of that list.
+
+        Input :
+                prompt = a string of characters representing the incomplete sentence to be completed
+                k = number of suggestions wanted, at most top_k_size
+
+        Time complexity : O(X + k), where X is length of prompt
+        Aux space complexity : O(k), for the output list
+        """
+        if k < 0:
+            raise ValueError("k must not be negative, got " + str(k))
+        if k > self.top_k_size:
+            raise ValueError("k = " + str(k) + " is larger than top_k_size = " + str(self.top_k_size))
+
+        node = self.find_node(prompt)
+        if node is None:
+            return []
+        return [terminal.sentence for terminal in node.top[:k]]
+
+    def cursor_children(self, cursor):
+        """
+        Function description : Returns an iterator of (character, cursor) pairs for every character that can follow cursor, in 
+                               lexicographic order
+
+        Time complexity : as for labelled_children
+        """
+        return self.labelled_children(cursor)
+
+    def cursor_terminal(self, cursor):
+        """
+        Function description : Returns the terminal node of the sentence ending exactly at cursor, None if no sentence ends there
+
+        Time complexity : O(1), constant time complexity
+        """
+        if cursor.terminator:
+            return cursor
+        return None
+
+    def save(self, path):
+        """
+        Function description : Writes the Trie to a binary file at path that MappedCatsTrie.open can map back without rebuilding
+
+        Time complexity : O(N + NK), where N is the number of characters stored in the Trie and K is top_k_size
+        """
+        with open(path, "wb") as file:
+            self.dump(file)
+
+    def to_bytes(self):
+        """
+        Function description : Returns the binary form written by save as a bytes object
+
+        Time complexity : O(N + NK), where N is the number of characters stored in the Trie and K is top_k_size
+        """
+        buffer = io.BytesIO()
+        self.dump(buffer)
+        return buffer.getvalue()
+
+    def dump(self, file):
+        """
+        Function description : Writes the binary form of the Trie, including frequencies and the cached best and top K of 
+                               every node, to the binary file object file. The layout is described in MappedCatsTrie.
+
+        Approach description : Nodes are numbered in breadth first order starting at 0 for the root, which places the children of 
+                               every node next to each other and in lexicographic order, and the children of node n right after 
+                               the children of node n - 1. child_start[n] is then the number of the first child of n and 
+                               child_start[n + 1] is one past its last child. Cursors are numbered rather than nodes so a 
+                               RadixCatsTrie is written with one node per character, exactly like a CatsTrie.
+
+                               Once every node is numbered, the cached best and top K terminal nodes are written as node numbers.
+
+        Time complexity : O(N + NK), where N is the number of characters stored in the Trie and K is top_k_size
+        Aux space complexity : O(N + NK), for the columns
+        """
+        cursors = [self.start_cursor()]
+        child_start = array("i")
+        label = array("I", [0])
+        parent = array("i", [-1])
+        terminal_number = {}                    ### id of terminal node to the number of its node in the file
+
+        # Number every cursor in breadth first order, the list of cursors is the queue - O(N)
+        number = 0
+        while number < len(cursors):
+            cursor = cursors[number]
+            child_start.append(len(cursors))
+            for char, child in self.cursor_children(cursor):
+                cursors.append(child)
+                label.append(ord(char))
+                parent.append(number)
+            terminal = self.cursor_terminal(cursor)
+            if terminal is not None:
+                terminal_number[id(terminal)] = number
+            number += 1
+        child_start.append(len(cursors))
+
+        # Frequencies and cached best and top K as node numbers - O(NK)
+        freq = array("q")
+        best = array("i")
+        top_start = array("i")
+        top = array("i")
+        for cursor in cursors:
+            terminal = self.cursor_terminal(cursor)
+            freq.append(0 if terminal is None else terminal.freq)
+            node = self.cursor_node(cursor)
+            best.append(-1 if node.best is None else terminal_number[id(node.best)])
+            top_start.append(len(top))
+            for entry in node.top:
+                top.append(terminal_number[id(entry)])
+        top_start.append(len(top))
+
+        file.write(struct.pack(MappedCatsTrie.HEADER, MappedCatsTrie.MAGIC, MappedCatsTrie.VERSION, 
+                               len(cursors), len(top), self.top_k_size, 0))
+        for column in (freq, child_start, label, parent, best, top_start, top):
+            if sys.byteorder == "big":
+                column.byteswap()               ### the file is always little endian
+            file.write(column.tobytes())
+            file.write(bytes(-len(column) * column.itemsize % 8))   ### keep every column 8 byte aligned
+
+    def find_node(self, prompt):
+        """
+        Function description : Traverses Trie according to each character in prompt and returns the node of the last character, 
+                               which is the root of every sentence starting with prompt. Returns None if prompt doesn't exist.
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        node = self.root                        ### start at root node
+
+        for char in prompt:
+            node = self.getChild(node, char)
+
+            # If at some point, the node doesn't have a child of next character in prompt
+            if node is None:
+                return None                     ### Prompt doesn't exist
+        return node
+
+    def find_best_sentence(self, node):
+        """
+        Function description : Traverses the whole subtree of node and returns the best sentence in it, the highest frequency
+                               and for the same frequency the lexicographically smaller one, or "" if the subtree has no sentence.
+                               autoComplete reads the cached best instead, this full traversal is kept for checking the caches.
+
+        Approach description : Instead of calling itself for every character, the traversal keeps an explicit stack holding one 
+                               iterator over the children of each node on the current path. The top iterator gives the next child 
+                               to visit, and an iterator that runs out is popped to go back up, so the stack never holds more than 
+                               the depth of the Trie and no recursion limit applies however long the sentences are.
+
+                               Children are visited in lexicographic order and a sentence only replaces the best when its frequency 
+                               is higher, so on the same frequency the lexicographically smaller sentence stays. Terminal nodes 
+                               already store their sentence, so no string is built while walking and the winner is read once at the end.
+
+        Time complexity : O(S), where S is the number of nodes in the subtree of node
+        Aux space complexity : O(D), where D is the depth of the subtree of node
+        """
+        best = None                                 ### terminal node of the best sentence up to this point
+        if node.terminator:
+            best = node
+
+        stack = [self.children(node)]               ### one iterator of children per node on the current path
+        while stack:
+            # next unvisited child of the deepest node, or go back up once all its children were visited
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                continue
+
+            # If current sentence frequency is higher than the best sentence up to this point
+            if child.terminator and (best is None or child.score > best.score):
+                best = child
+            stack.append(self.children(child))
+
+        if best is None:
+            return ""
+        return best.sentence
+
+    def children(self, node):
+        """
+        Function description : Returns an iterator over the existing children of node in lexicographic order of their characters
+
+        Time complexity : as for labelled_children
+        """
+        return (child for char, child in self.labelled_children(node))
+
+class RadixTrieNode(TrieNode):
+    """
+    Class Description : A node of a path-compressed Trie. On top of TrieNode information it stores :
+                        Label - the string on the edge into this node, a node's child for a character is the child whose
+                                label starts with that character
+    """
+    def __init__(self, label="", slots=26):
+        super().__init__(slots)
+        self.label = label
+
+class RadixCatsTrie(CatsTrie):
+    """
+    Class Description : A path-compressed (radix) CatsTrie. Chains of single child nodes are merged into one node whose edge
+                        label holds the whole chain, so the number of nodes and the depth of a walk only grow with the 
+                        points where sentences branch. Created with CatsTrie(sentences, radix=True) or directly, and answers
+                        autoComplete and top_k exactly like CatsTrie.
+    """
+    def getNode(self, label=""):
+        """
+        Function description : Creates a RadixTrieNode object with the given edge label
+
+        Time complexity : O(A), where A is the size of a dense alphabet, O(1) with dictionary children
+        """
+        self.node_count += 1
+        return RadixTrieNode(label, len(self.alphabet) if self.dense else 0)
+
+    def insert(self, sentence, count=1):
+        """
+        Function description : Walks down the Trie matching sentence against whole edge labels and adds sentence, splitting
+                               an edge where sentence leaves it part way. The frequency of sentence increases by count.
+
+        Approach description : At each node the child is picked by the next character of sentence, then the rest of its label 
+                               is compared with sentence. If sentence runs out or differs inside the label, the edge is split
+                               by placing a new node holding the matched part of the label above the child. The new node's 
+                               subtree is the child's subtree so it starts with a copy of the child's cached best and top K.
+                               If no child exists, the remaining sentence becomes the label of one new leaf.
+
+                               The nodes on the path are then updated by the same finishInsert as CatsTrie.
+
+        Time complexity : O(MK), where M is number of characters in the longest sentence and K is top_k_size
+        Aux space complexity : O(M), for the path of visited nodes and new labels
+        """
+        self.checkCount(count)
+        self.checkAlphabet(sentence)
+        node = self.root
+        path = [node]
+        position = 0                            ### number of characters of sentence matched so far
+
+        while position < len(sentence):
+            child = self.getChild(node, sentence[position])
+
+            # No edge starts with the next character, the rest of sentence becomes one leaf
+            if child is None:
+                child = self.getNode(sentence[position:])
+                self.setChild(node, sentence[position], child)
+                path.append(child)
+                node = child
+                break
+
+            # Count how many characters of the label match sentence, the first always does
+            label = child.label
+            matched = 1
+            limit = min(len(label), len(sentence) - position)
+            while matched < limit and label[matched] == sentence[position + matched]:
+                matched += 1
+
+            # Sentence leaves the edge part way, split the edge at matched, prompts cached at child may now end at middle
+            if matched < len(label):
+                self.invalidate(child)
+                middle = self.getNode(label[:matched])
+                child.label = label[matched:]
+                self.setChild(middle, child.label[0], child)
+                middle.best = child.best
+                middle.top = list(child.top)
+                middle.count = child.count
+                middle.weight = child.weight
+                self.setChild(node, label[0], middle)
+                child = middle
+
+            node = child
+            path.append(node)
+            position += matched
+
+        self.finishInsert(path, sentence, count)
+
+    def start_cursor(self):
+        """
+        Function description : Returns a cursor for the empty prompt. In a RadixCatsTrie a prompt can end inside an edge label,
+                               so a cursor is a tuple (node, matched) of the node below the current edge and how many characters
+                               of its label are matched.
+
+        Time complexity : O(1), constant time complexity
+        """
+        return (self.root, 0)
+
+    def advance(self, cursor, char):
+        """
+        Function description : Returns the cursor after walking one more character char from cursor, None if the Trie has no
+                               sentence continuing with char.
+
+        Time complexity : O(1), constant time complexity
+        """
+        node, matched = cursor
+        if matched < len(node.label):
+            # still inside the edge label, the next label character has to be char
+            if node.label[matched] == char:
+                return (node, matched + 1)
+            return None
+
+        child = self.getChild(node, char)
+        if child is None:
+            return None
+        return (child, 1)
+
+    def autoComplete_many(self, prompts):
+        """
+        Function description : Same as CatsTrie.autoComplete_many, with path holding the cursors of advance as a character 
+                               can end inside an edge label
+
+        Time complexity : O(P + U log U + T), as CatsTrie.autoComplete_many
+        Aux space complexity : O(U + X), as CatsTrie.autoComplete_many
+        """
+        answers = dict.fromkeys(prompts)
+        path = [self.start_cursor()]
+        previous = ""
+
+        for prompt in sorted(answers):
+            depth = len(path) - 1
+            if not prompt.startswith(previous[:depth]):
+                depth = shared_length(prompt, previous)
+                del path[depth + 1:]
+            cursor = path[-1]
+
+            if cursor is not None:
+                for char in prompt[depth:]:
+                    cursor = self.advance(cursor, char)
+                    path.append(cursor)
+                    if cursor is None:
+                        break
+
+            answers[prompt] = None if cursor is None else self.suggestion(cursor[0])
+            previous = prompt
+
+        return [answers[prompt] for prompt in prompts]
+
+    def walk(self, cursor, text):
+        """
+        Function description : Returns the cursor after walking every character of text from cursor, None if the Trie has no 
+                               sentence continuing with text.
+
+        Time complexity : O(T), where T is length of text
+        """
+        for char in text:
+            cursor = self.advance(cursor, char)
+            if cursor is None:
+                return None
+        return cursor
+
+    def cursor_node(self, cursor):
+        """
+        Function description : Returns the node whose subtree holds every sentence starting with the prompt walked by cursor,
+                               the node below the edge when the prompt ends inside an edge label.
+
+        Time complexity : O(1), constant time complexity
+        """
+        return cursor[0]
+
+    def cursor_children(self, cursor):
+        """
+        Function description : Returns an iterator of (character, cursor) pairs for every character that can follow cursor, in 
+                               lexicographic order. Inside an edge label only the next label character can follow.
+
+        Time complexity : O(1) inside an edge label, as for labelled_children at the end of one
+        """
+        node, matched = cursor
+        if matched < len(node.label):
+            return iter([(node.label[matched], (node, matched + 1))])
+        return ((child.label[0], (child, 1)) for child in self.children(node))
+
+    def cursor_terminal(self, cursor):
+        """
+        Function description : Returns the terminal node of the sentence ending exactly at cursor, None if no sentence ends there
+
+        Time complexity : O(1), constant time complexity
+        """
+        node, matched = cursor
+        if matched == len(node.label) and node.terminator:
+            return node
+        return None
+
+    def findPath(self, sentence):
+        """
+        Function description : Returns the list of nodes from the root to the terminal node of sentence, which must be in the Trie
+
+        Time complexity : O(M), where M is number of characters in sentence
+        """
+        path = [self.root]
+        position = 0
+        while position < len(sentence):
+            path.append(self.getChild(path[-1], sentence[position]))
+            position += len(path[-1].label)
+        return path
+
+    def prune(self, path, sentence):
+        """
+        Function description : Removes the nodes at the end of path, the path of sentence which was just evicted, that have no 
+                               sentence ending at them or below them. A node left with no sentence and a single child is 
+                               merged into that child, joining their labels, to keep the Trie path-compressed. Returns the part 
+                               of path that is left.
+
+        Time complexity : O(MA), where M is number of characters in sentence and A the size of the alphabet
+        """
+        depth = len(path) - 1
+        while depth > 0 and not path[depth].terminator and next(self.labelled_children(path[depth]), None) is None:
+            self.removeChild(path[depth - 1], path[depth].label[0])
+            self.node_count -= 1
+            depth -= 1
+
+        node = path[depth]
+        if depth > 0 and not node.terminator:
+            children = list(self.labelled_children(node))
+            if len(children) == 1:
+                # the child takes the place of node, its own subtree and caches are unchanged
+                child = children[0][1]
+                child.label = node.label + child.label
+                self.setChild(path[depth - 1], child.label[0], child)
+                self.node_count -= 1
+                depth -= 1
+        return path[:depth + 1]
+
+    def find_node(self, prompt):
+        """
+        Function description : Traverses Trie according to prompt one edge label at a time and returns the node whose subtree
+                               holds every sentence starting with prompt. When prompt ends inside an edge label that is the 
+                               node below the edge. Returns None if prompt doesn't exist.
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        node = self.root
+        position = 0
+
+        while position < len(prompt):
+            node = self.getChild(node, prompt[position])
+            if node is None:
+                return None
+
+            # compare the label with the rest of prompt, prompt may end inside the label
+            label = node.label
+            limit = min(len(label), len(prompt) - position)
+            if label[:limit] != prompt[position:position + limit]:
+                return None
+            position += limit
+        return node
+
+class AutoCompleteSession:
+    """
+    Class Description : Follows a prompt being typed one keystroke at a time so the prompt is never walked again from the root.
+                        A stack holds the cursor reached after every typed character, push adds a character by advancing the 
+                        top cursor, pop (backspace) goes back to the cursor below and best reads the cached suggestion of the 
+                        top cursor. Created with CatsTrie.session().
+
+                        Sentences recorded while a session is open show up in best as long as the typed prompt was already 
+                        in the Trie. A RadixCatsTrie may split the edge a cursor points into when inserting, and a Trie with 
+                        max_nodes may remove the nodes of evicted sentences, so sessions on those should be started again 
+                        after inserting.
+                        trie : the CatsTrie being searched
+                        prompt : the characters typed so far
+    """
+    def __init__(self, trie, prompt=""):
+        """
+        Initialisation of the session at the empty prompt, then typing every character of prompt
+
+        Time complexity : O(X), where X is length of prompt
+        """
+        self.trie = trie
+        self.chars = []
+        self.cursors = [trie.start_cursor()]        ### cursors[d] after d typed characters, None once off the Trie
+        for char in prompt:
+            self.push(char)
+
+    @property
+    def prompt(self):
+        """ The characters typed so far """
+        return "".join(self.chars)
+
+    def __len__(self):
+        """ Number of characters typed so far """
+        return len(self.chars)
+
+    def push(self, char):
+        """
+        Function description : Types one more character. Once the prompt has no matching sentence, further characters keep a 
+                               None cursor so backspacing still lands on the right cursor.
+
+        Time complexity : O(1), constant time complexity
+        """
+        cursor = self.cursors[-1]
+        if cursor is not None:
+            cursor = self.trie.advance(cursor, char)
+        self.chars.append(char)
+        self.cursors.append(cursor)
+
+    def pop(self):
+        """
+        Function description : Removes the last typed character, like a backspace, and returns it
+
+        Time complexity : O(1), constant time complexity
+        """
+        if not self.chars:
+            raise IndexError("pop from an empty prompt")
+        self.cursors.pop()
+        return self.chars.pop()
+
+    def best(self):
+        """
+        Function description : Returns what autoComplete would return for the prompt typed so far
+
+        Time complexity : O(1), constant time complexity
+        """
+        cursor = self.cursors[-1]
+        return self.trie.suggestion(None if cursor is None else self.trie.cursor_node(cursor))
+
+    def top_k(self, k):
+        """
+        Function description : Returns what top_k would return for the prompt typed so far
+
+        Time complexity : O(k)
+        """
+        if k < 0:
+            raise ValueError("k must not be negative, got " + str(k))
+        if k > self.trie.top_k_size:
+            raise ValueError("k = " + str(k) + " is larger than top_k_size = " + str(self.trie.top_k_size))
+        cursor = self.cursors[-1]
+        if cursor is None:
+            return []
+        return [terminal.sentence for terminal in self.trie.cursor_node(cursor).top[:k]]
+
+class CompactCatsTrie:
+    """
+    Class Description : A Trie with the same insert / autoComplete contract as CatsTrie but without a Python object per node.
+                        Nodes are numbered from 0 (the root) and every piece of node information is a column in a flat array,
+                        the node number being the position in each column :
+                            child_start - position of the node's children in children and child_label
+                            child_count - number of children of the node
+                            parent - node number of the parent, -1 for the root, used to rebuild sentences
+                            label - code point of the character on the edge into the node, only children that exist are stored
+                            terminator - 1 if a sentence ends at the node
+                            freq - the amount of times the sentence ending at the node exist in sentences
+                            best - node number of the terminal with the best sentence in the node's subtree, -1 if none
+
+                        The children of a node are a contiguous block of the shared children array, node numbers, and of 
+                        child_label, their labels, kept sorted by label. A lookup step is one binary search over the labels 
+                        of a single block, and traversals still happen in lexicographic order. Blocks have a power of two 
+                        capacity, a full block is moved to the end of the arrays with twice the room, so adding a child 
+                        costs amortised O(C) and at most half of the block space is left behind by moves.
+
+                        Any character can be stored, as labels are code points and no node reserves room for characters it
+                        has no child for. A node costs about 41 bytes across the columns and blocks instead of a TrieNode 
+                        object and its child list.
+    """
+    def __init__(self, sentences):
+        """
+        Function Description : takes in a list of sentence (strings) and construct the Trie stucture to include every string in the sentences list
+
+        Time complexity : O(NM), where N is number of sentence in sentences and M is number of characters in the longest sentence
+        Aux Space complexity : O(NM), where N is number of sentence in sentences and M is number of characters in the longest sentence
+        """
+        self.child_start = array("i")
+        self.child_count = array("i")
+        self.children = array("i")
+        self.child_label = array("I")
+        self.parent = array("i")
+        self.label = array("I")
+        self.terminator = bytearray()
+        self.freq = array("q")
+        self.best = array("i")
+
+        self.root = self.getNode(-1, 0)                ### Create root node
+
+        # Insert every sentence in sentences into Trie - O(NM)
+        for sentence in sentences:
+            self.insert(sentence)
+
+    def __len__(self):
+        """ Number of nodes in the Trie, including the root """
+        return len(self.parent)
+
+    def getNode(self, parent, code):
+        """
+        Function description : Appends a new node without children to every column and returns its node number. The node 
+                               is not added to its parent's children yet.
+
+        Time complexity : O(1), amortised constant time for appending to arrays
+        """
+        self.child_start.append(0)
+        self.child_count.append(0)
+        self.parent.append(parent)
+        self.label.append(code)
+        self.terminator.append(0)
+        self.freq.append(0)
+        self.best.append(-1)
+        return len(self.parent) - 1
+
+    def getChild(self, node, code):
+        """
+        Function description : Returns the node number of node's child with the given label, or -1 if there is no such child.
+
+        Time complexity : O(log C), where C is the number of children of node
+        """
+        start = self.child_start[node]
+        end = start + self.child_count[node]
+        position = bisect_left(self.child_label, code, start, end)
+        if position != end and self.child_label[position] == code:
+            return self.children[position]
+        return -1
+
+    def addChild(self, node, code):
+        """
+        Function description : Returns the node number of node's child with the given label, creating it at its sorted
+                               position in node's block of children if it does not exist.
+
+        Approach description : A block of count children has room for the next power of two, so it is full when count is 0 
+                               or a power of two. A block with room shifts the larger labels up by one, a full block is 
+                               copied to the end of the arrays with the new child in place and twice the capacity.
+
+        Time complexity : O(C), amortised, where C is the number of children of node
+        """
+        start = self.child_start[node]
+        count = self.child_count[node]
+        end = start + count
+        position = bisect_left(self.child_label, code, start, end)
+        if position != end and self.child_label[position] == code:
+            return self.children[position]
+
+        new = self.getNode(node, code)
+        children, labels = self.children, self.child_label
+        if count & (count - 1):
+            # room left in the block, shift the larger labels up by one
+            children[position + 1:end + 1] = children[position:end]
+            labels[position + 1:end + 1] = labels[position:end]
+            children[position] = new
+            labels[position] = code
+        else:
+            # full block, move it to the end with twice the capacity
+            capacity = max(1, 2 * count)
+            self.child_start[node] = len(children)
+            children.extend(children[start:position])
+            children.append(new)
+            children.extend(children[position:end])
+            children.extend(array("i", [0]) * (capacity - count - 1))
+            labels.extend(labels[start:position])
+            labels.append(code)
+            labels.extend(labels[position:end])
+            labels.extend(array("I", [0]) * (capacity - count - 1))
+        self.child_count[node] = count + 1
+        return new
+
+    def insert(self, sentence):
+        """
+        Function description : Iterates over each character in sentence, creating nodes that do not exist, then increases the
+                               frequency of the terminal node and updates the best terminal of every node on the path.
+
+        Approach description : The path is processed from the terminal node up to the root. Only the inserted sentence changed
+                               frequency so at each node it only has to be compared with the node's current best. On a frequency
+                               tie the sentences are compared without rebuilding them : if the current best sits under the same 
+                               child as the inserted sentence it is the best of that child, already compared one level down, 
+                               so the result is carried up. Otherwise the two sentences part at this node and the edge labels decide,
+                               a terminator at the node itself being a prefix and so always smaller.
+
+        Time complexity : O(M), where M is number of characters in sentence, plus the climb to find a diverging label on ties
+        Aux space complexity : O(M), for the path of visited nodes
+        """
+        node = self.root
+        path = [node]
+
+        # Walk down the Trie creating missing nodes - O(M)
+        for char in sentence:
+            node = self.addChild(node, ord(char))
+            path.append(node)
+
+        terminal = node
+        self.terminator[terminal] = 1
+        self.freq[terminal] += 1
+        frequency = self.freq[terminal]
+
+        # Bottom up update of best, smaller carries whether sentence < best of the child below before this update
+        smaller = True
+        below_best = -1                         ### best of the child on the path, before this update
+        for depth in range(len(path) - 1, -1, -1):
+            node = path[depth]
+            current = self.best[node]
+
+            if current != terminal:
+                if current == -1 or node == terminal:
+                    smaller = True              ### below the terminal every sentence extends sentence
+                elif current == below_best:
+                    pass                        ### same sentence as one level down, comparison carries up
+                elif current == node:
+                    smaller = False             ### current best ends here so it is a prefix of sentence
+                else:
+                    # find the child of node that current is under, and compare it with the next character of sentence
+                    branch = current
+                    while self.parent[branch] != node:
+                        branch = self.parent[branch]
+                    smaller = ord(sentence[depth]) < self.label[branch]
+
+                if current == -1 or frequency > self.freq[current] or (frequency == self.freq[current] and smaller):
+                    self.best[node] = terminal
+            below_best = current
+
+    def find_node(self, prompt):
+        """
+        Function description : Traverses Trie according to each character in prompt and returns the node number of the last 
+                               character. Returns -1 if prompt doesn't exist.
+
+        Time complexity : O(X log C), where X is length of prompt and C the largest number of children of a node
+        """
+        node = self.root
+        for char in prompt:
+            node = self.getChild(node, ord(char))
+            if node == -1:
+                return -1
+        return node
+
+    def autoComplete(self, prompt):
+        """
+        Function description : Accepts a string of characters (prompt) and return a string representing the 
+                               completed sentence / best word to use for auto-complete from prompt, None if prompt doesn't exist
+
+        Approach description : After walking to the prompt's node, its best terminal is followed up through parent until the
+                               prompt's node is reached again, collecting the labels of the remaining characters in reverse.
+
+        Time complexity : O(X log C + Y), where X is length of prompt, C the largest number of children of a node and Y the length of the returned sentence
+        Aux space complexity : O(Y), for the rebuilt characters
+        """
+        node = self.find_node(prompt)
+        if node == -1:
+            return None
+        terminal = self.best[node]
+        if terminal == -1:
+            return ""
+
+        # Rebuild the part of the sentence after prompt - O(Y)
+        label, parent = self.label, self.parent
+        codes = []
+        while terminal != node:
+            codes.append(label[terminal])
+            terminal = parent[terminal]
+        codes.reverse()
+        return prompt + "".join(map(chr, codes))
+
+    def autoComplete_many(self, prompts):
+        """ Returns autoComplete of every prompt in prompts, in order """
+        return [self.autoComplete(prompt) for prompt in prompts]
+
+class MappedCatsTrie:
+    """
+    Class Description : Read-only CatsTrie answering autoComplete and top_k straight from the binary form written by 
+                        CatsTrie.save. The file is memory-mapped and every column is a memoryview over the mapping, so opening
+                        costs the same for any corpus size, nodes are only read from disk when a lookup touches them and 
+                        several processes opening the same file share one copy in the page cache.
+
+                        File layout, little endian, every column padded to a multiple of 8 bytes :
+                            header - magic "CATS", version, node count N, top entry count T, top_k_size, reserved (uint32 each)
+                            freq - int64[N], frequency of the sentence ending at each node, 0 if none
+                            child_start - int32[N + 1], children of node n are the nodes child_start[n] to child_start[n + 1] - 1
+                            label - uint32[N], code point of the character on the edge into each node
+                            parent - int32[N], parent of each node, -1 for the root 0
+                            best - int32[N], node of the best sentence in each node's subtree, -1 if none
+                            top_start - int32[N + 1], top K of node n is top[top_start[n]] to top[top_start[n + 1] - 1]
+                            top - int32[T], nodes of the ranked top K sentences of every node
+    """
+    MAGIC = b"CATS"
+    VERSION = 1
+    HEADER = "<4sIIIII"
+
+    def __init__(self, buffer):
+        """
+        Initialisation of the columns as views over buffer, any object supporting the buffer protocol like bytes or an mmap
+
+        Time complexity : O(1), no node is read
+        """
+        if sys.byteorder == "big":
+            raise ValueError("MappedCatsTrie reads the little endian columns in place, which needs a little endian machine")
+
+        self.buffer = buffer
+        view = memoryview(buffer)
+        magic, version, nodes, tops, self.top_k_size, reserved = struct.unpack_from(self.HEADER, view)
+        if magic != self.MAGIC or version != self.VERSION:
+            raise ValueError("not a CatsTrie file of version " + str(self.VERSION))
+
+        # slice every column out of the buffer without copying
+        offset = struct.calcsize(self.HEADER)
+        columns = []
+        for typecode, length in (("q", nodes), ("i", nodes + 1), ("I", nodes), ("i", nodes), 
+                                 ("i", nodes), ("i", nodes + 1), ("i", tops)):
+            size = length * struct.calcsize(typecode)
+            columns.append(view[offset:offset + size].cast(typecode))
+            offset += size + (-size % 8)
+        self.freq, self.child_start, self.label, self.parent, self.best, self.top_start, self.top = columns
+
+    @classmethod
+    def open(cls, path):
+        """
+        Function description : Memory-maps the file at path read-only and returns a MappedCatsTrie over it
+
+        Time complexity : O(1), no node is read
+        """
+        with open(path, "rb") as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(mapping)
+
+    def close(self):
+        """ Releases the columns and closes the mapping if the trie was opened from a file """
+        for column in (self.freq, self.child_start, self.label, self.parent, self.best, self.top_start, self.top):
+            column.release()
+        if isinstance(self.buffer, mmap.mmap):
+            self.buffer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """ Number of nodes in the Trie, including the root """
+        return len(self.parent)
+
+    def find_node(self, prompt):
+        """
+        Function description : Traverses Trie according to each character in prompt and returns the node number of the last 
+                               character. Returns -1 if prompt doesn't exist.
+
+        Approach description : Children of a node are consecutive and sorted by label, so each character is found with a
+                               binary search over the labels of the current node's children.
+
+        Time complexity : O(X log C), where X is length of prompt and C the largest number of children of a node
+        """
+        node = 0
+        for char in prompt:
+            code = ord(char)
+            low, high = self.child_start[node], self.child_start[node + 1]
+            position = bisect_left(self.label, code, low, high)
+            if position == high or self.label[position] != code:
+                return -1
+            node = position
+        return node
+
+    def sentence(self, terminal, node=0, prompt=""):
+        """
+        Function description : Rebuilds the sentence ending at terminal by following parent up to node, whose sentence prefix 
+                               prompt is already known
+
+        Time complexity : O(Y), where Y is the number of characters between node and terminal
+        """
+        chars = []
+        while terminal != node:
+            chars.append(chr(self.label[terminal]))
+            terminal = self.parent[terminal]
+        chars.reverse()
+        return prompt + "".join(chars)
+
+    def autoComplete(self, prompt):
+        """
+        Function description : Returns the same completion as CatsTrie.autoComplete for the saved Trie, None if prompt doesn't exist
+
+        Time complexity : O(X log C + Y), where X is length of prompt, C the largest number of children of a node and Y the 
+                          length of the returned sentence
+        """
+        node = self.find_node(prompt)
+        if node == -1:
+            return None
+        if self.best[node] == -1:
+            return ""
+        return self.sentence(self.best[node], node, prompt)
+
+    def autoComplete_many(self, prompts):
+        """ Returns autoComplete of every prompt in prompts, in order """
+        return [self.autoComplete(prompt) for prompt in prompts]
+
+    def top_k(self, prompt, k):
+        """
+        Function description : Returns the same list as CatsTrie.top_k for the saved Trie
+
+        Time complexity : O(X log C + kY), where X is length of prompt, C the largest number of children of a node and Y the 
+                          length of the longest returned sentence
+        """
+        if k < 0:
+            raise ValueError("k must not be negative, got " + str(k))
+        if k > self.top_k_size:
+            raise ValueError("k = " + str(k) + " is larger than top_k_size = " + str(self.top_k_size))
+        node = self.find_node(prompt)
+        if node == -1:
+            return []
+        start = self.top_start[node]
+        end = min(start + k, self.top_start[node + 1])
+        return [self.sentence(self.top[entry], node, prompt) for entry in range(start, end)]
+
+class ShardedCatsTrie:
+    """
+    Class Description : Read-only CatsTrie made of one saved Trie per first character, built by CatsTrie.build_parallel. 
+                        Every prompt but the empty one is answered by the shard of its first character, a MappedCatsTrie over 
+                        the shard's binary form, and the empty prompt by the ranking of the shards' root top K lists.
+                        shards : dictionary from first character to the MappedCatsTrie of the sentences starting with it
+                        empty : number of times the empty sentence was given
+                        top : the top_k_size best sentences of every shard, best first
+    """
+    def __init__(self, shards, empty=0, top_k_size=10):
+        """
+        Initialisation from a dictionary of first character to the binary form of that shard's CatsTrie
+
+        Time complexity : O(SK log SK + SKY), where S is the number of shards, K is top_k_size and Y the length of the 
+                          longest sentence ranked
+        """
+        self.shards = {char: MappedCatsTrie(data) for char, data in shards.items()}
+        self.empty = empty
+        self.top_k_size = top_k_size
+
+        # every shard's root top K, or its best when K is 0, ranked by highest frequency then smaller sentence
+        ranked = [(-empty, "")] if empty else []
+        for shard in self.shards.values():
+            entries = shard.top[shard.top_start[0]:shard.top_start[1]].tolist()
+            if not entries and shard.best[0] != -1:
+                entries = [shard.best[0]]
+            ranked.extend((-shard.freq[entry], shard.sentence(entry)) for entry in entries)
+        ranked.sort()
+        self.best = ranked[0][1] if ranked else ""
+        self.top = [sentence for freq, sentence in ranked[:top_k_size]]
+
+    def close(self):
+        """ Releases every shard """
+        for shard in self.shards.values():
+            shard.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        """ Number of nodes in the Trie, including the root shared by the shards """
+        return 1 + sum(len(shard) - 1 for shard in self.shards.values())
+
+    def autoComplete(self, prompt):
+        """
+        Function description : Returns the same completion as CatsTrie.autoComplete, None if prompt doesn't exist
+
+        Time complexity : O(X log C + Y), where X is length of prompt, C the largest number of children of a node and Y the 
+                          length of the returned sentence
+        """
+        if not prompt:
+            return self.best
+        shard = self.shards.get(prompt[0])
+        if shard is None:
+            return None
+        return shard.autoComplete(prompt)
+
+    def autoComplete_many(self, prompts):
+        """ Returns autoComplete of every prompt in prompts, in order """
+        return [self.autoComplete(prompt) for prompt in prompts]
+
+    def top_k(self, prompt, k):
+        """
+        Function description : Returns the same list as CatsTrie.top_k
+
+        Time complexity : O(X log C + kY), where X is length of prompt, C the largest number of children of a node and Y the 
+                          length of the longest returned sentence
+        """
+        if k < 0:
+            raise ValueError("k must not be negative, got " + str(k))
+        if k > self.top_k_size:
+            raise ValueError("k = " + str(k) + " is larger than top_k_size = " + str(self.top_k_size))
+        if not prompt:
+            return self.top[:k]
+        shard = self.shards.get(prompt[0])
+        if shard is None:
+            return []
+        return shard.top_k(prompt, k)
+
+class SortedCatsIndex:
+    """
+    Class Description : Read-only autocomplete index answering autoComplete like CatsTrie, built from the same sentences
+                        but without any Trie. The distinct sentences are sorted and concatenated into one string, so the 
+                        sentences starting with a prompt are one consecutive range found with two binary searches, and the
+                        best sentence of any range is read from a sparse table in constant time.
+                        buffer : the sorted distinct sentences concatenated
+                        offsets : sentence i is buffer[offsets[i]:offsets[i + 1]]
+                        freq : frequency of sentence i
+                        table : table[j][i] is the best sentence among sentences i to i + 2^j - 1
+    """
+    def __init__(self, sentences):
+        """
+        Initialisation of the index, counting, sorting and concatenating the sentences and building the sparse table level by 
+        level, each level combining two ranges of the level below
+
+        Time complexity : O(NM + U log U), where N is number of sentences, M is number of characters in the longest sentence
+                          and U is the number of distinct sentences, from sorting and the log U levels of the table
+        Aux space complexity : O(UM + U log U), for the buffer and the table
+        """
+        counts = {}
+        for sentence in sentences:
+            counts[sentence] = counts.get(sentence, 0) + 1
+        ordered = sorted(counts)
+
+        self.buffer = "".join(ordered)
+        self.offsets = array("q", [0])
+        self.freq = array("q")
+        for sentence in ordered:
+            self.offsets.append(self.offsets[-1] + len(sentence))
+            self.freq.append(counts[sentence])
+
+        # level 0 holds every sentence itself, level j the better of two halves of length 2^(j - 1) - O(U log U)
+        self.table = [array("i", range(len(ordered)))]
+        length = 1
+        while 2 * length <= len(ordered):
+            below = self.table[-1]
+            level = array("i", (self.better(below[i], below[i + length]) for i in range(len(ordered) - 2 * length + 1)))
+            self.table.append(level)
+            length *= 2
+
+    def __len__(self):
+        """ Number of distinct sentences """
+        return len(self.freq)
+
+    def sentence(self, i):
+        """ Returns sentence i in sorted order """
+        return self.buffer[self.offsets[i]:self.offsets[i + 1]]
+
+    def better(self, i, j):
+        """
+        Function description : Returns whichever of sentences i and j ranks higher, the higher frequency and for the same 
+                               frequency the lexicographically smaller one, which is the smaller position in sorted order
+        """
+        if self.freq[i] != self.freq[j]:
+            return i if self.freq[i] > self.freq[j] else j
+        return min(i, j)
+
+    def prefix_range(self, prompt):
+        """
+        Function description : Returns (low, high) such that the sentences starting with prompt are low to high - 1
+
+        Approach description : low is the first sentence not smaller than prompt. Every sentence starting with prompt follows 
+                               it, and they end at the first sentence whose first X characters are larger than prompt.
+
+        Time complexity : O(X log U), where X is length of prompt and U the number of distinct sentences
+        """
+        low, high = 0, len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.sentence(middle) < prompt:
+                low = middle + 1
+            else:
+                high = middle
+
+        start = low
+        high = len(self)
+        while low < high:
+            middle = (low + high) // 2
+            if self.buffer[self.offsets[middle]:min(self.offsets[middle] + len(prompt), self.offsets[middle + 1])] == prompt:
+                low = middle + 1
+            else:
+                high = middle
+        return start, low
+
+    def range_best(self, low, high):
+        """
+        Function description : Returns the best sentence among sentences low to high - 1, which must not be empty, from the 
+                               two overlapping table ranges of the largest power of two length covering it
+
+        Time complexity : O(1), constant time complexity
+        """
+        level = (high - low).bit_length() - 1
+        return self.better(self.table[level][low], self.table[level][high - (1 << level)])
+
+    def autoComplete(self, prompt):
+        """
+        Function description : Returns the same completion as CatsTrie.autoComplete built from the same sentences, None if no 
+                               sentence starts with prompt
+
+        Time complexity : O(X log U + Y), where X is length of prompt, U the number of distinct sentences and Y the length of 
+                          the returned sentence
+        """
+        low, high = self.prefix_range(prompt)
+        if low == high:
+            return "" if prompt == "" else None         ### like the root of an empty CatsTrie
+        return self.sentence(self.range_best(low, high))
+
+    def autoComplete_many(self, prompts):
+        """ Returns autoComplete of every prompt in prompts, in order """
+        return [self.autoComplete(prompt) for prompt in prompts]
+
+class AutoCompleteServer:
+    """
+    Class Description : asyncio server answering autoComplete requests for one CatsTrie over TCP or a Unix socket.
+
+                        The protocol is line based and UTF-8 : every request line is a prompt and gets one response line, 
+                        the JSON of the autoComplete result, a string or null, in the order requests were sent. The request 
+                        line "!stats" is answered with the JSON of stats() instead. A request that failed is answered with
+                        a JSON object {"error": message}, which is never a result.
+
+                        Requests arriving within window seconds of each other, from any connection, are answered together 
+                        with one autoComplete_many call, which walks the prefixes they share once. A connection may send 
+                        several requests before reading any response, and they are batched too.
+                        trie : the CatsTrie, or any object with autoComplete_many, being served
+                        window : seconds a request waits for others to join its batch
+                        max_batch : a batch is answered right away once it has this many requests
+    """
+    STATS = "!stats"
+
+    def __init__(self, trie, window=0.002, max_batch=1024, latency_samples=10000):
+        """ Initialisation of the server and its metrics, latencies of the last latency_samples requests are kept """
+        self.trie = trie
+        self.window = window
+        self.max_batch = max_batch
+        self.pending = []                               ### (prompt, future, time submitted) waiting for the next batch
+        self.flush_handle = None
+        self.server = None
+        self.connections = {}                           ### task serving every open connection to its writer
+
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=latency_samples)
+        self.started = time.perf_counter()
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Function description : Starts listening on host and port, or on the Unix socket path if given, and returns the 
+                               asyncio server. Port 0 picks a free port, see address.
+        """
+        if path is None:
+            self.server = await asyncio.start_server(self.handle, host, port)
+        else:
+            self.server = await asyncio.start_unix_server(self.handle, path)
+        self.started = time.perf_counter()
+        return self.server
+
+    @property
+    def address(self):
+        """ The address the server listens on, (host, port) for TCP or the socket path """
+        return self.server.sockets[0].getsockname()
+
+    async def close(self, grace=1.0):
+        """
+        Function description : Stops listening and gives the connections still open grace seconds to be closed by their clients, 
+                               then closes them. A closed connection reads as ended, so its task answers what it already read 
+                               and finishes.
+        """
+        self.server.close()
+        if self.connections:
+            done, pending = await asyncio.wait(list(self.connections), timeout=grace)
+            for connection in pending:
+                self.connections[connection].close()
+            if pending:
+                await asyncio.wait(pending)
+        await self.server.wait_closed()
+
+    def submit(self, prompt):
+        """
+        Function description : Adds prompt to the next batch and returns a future of its autoComplete result. The first request
+                               of a batch schedules the batch to be answered after window seconds.
+
+        Time complexity : O(1), O(B(X + log B)) when it fills the batch of B prompts
+        """
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((prompt, future, time.perf_counter()))
+        if len(self.pending) >= self.max_batch:
+            self.flush()
+        elif self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(self.window, self.flush)
+        return future
+
+    def flush(self):
+        """
+        Function description : Answers every pending request with one autoComplete_many call
+
+        Time complexity : O(B log B + T), where B is the number of pending prompts and T the characters walked by autoComplete_many
+        """
+        if self.flush_handle is not None:
+            self.flush_handle.cancel()
+            self.flush_handle = None
+        batch, self.pending = self.pending, []
+        if not batch:
+            return
+
+        # a failed batch fails every request in it, rather than leaving their connections waiting
+        try:
+            results = self.trie.autoComplete_many([prompt for prompt, future, submitted in batch])
+        except Exception as error:
+            for prompt, future, submitted in batch:
+                if not future.cancelled():
+                    future.set_exception(error)
+            self.errors += len(batch)
+            return
+        finished = time.perf_counter()
+        for (prompt, future, submitted), result in zip(batch, results):
+            if not future.cancelled():
+                future.set_result(result)
+            self.latencies.append(finished - submitted)
+        self.requests += len(batch)
+        self.batches += 1
+
+    async def handle(self, reader, writer):
+        """
+        Function description : Serves one connection. Request lines are submitted as they are read while a second task writes 
+                               the responses in request order, so requests sent ahead of their responses join one batch.
+        """
+        connection = asyncio.current_task()
+        self.connections[connection] = writer
+        responses = asyncio.Queue()
+
+        async def respond():
+            while True:
+                future = await responses.get()
+                if future is None:
+                    break
+                try:
+                    response = await future
+                except Exception as error:
+                    response = {"error": type(error).__name__ + " : " + str(error)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+
+        responder = asyncio.create_task(respond())
+        try:
+            try:
+                while True:
+                    line = await reader.readline()
+                    if not line:
+                        break
+                    prompt = line.decode("utf-8", "replace").rstrip("\r\n")
+                    if prompt == self.STATS:
+                        future = asyncio.get_running_loop().create_future()
+                        future.set_result(self.stats())
+                    else:
+                        future = self.submit(prompt)
+                    await responses.put(future)
+            finally:
+                await responses.put(None)
+                await responder
+        except ConnectionError:
+            pass                                        ### the client went away, there is no one left to answer
+        finally:
+            writer.close()
+            del self.connections[connection]
+
+    def stats(self):
+        """
+        Function description : Returns a dictionary of metrics : requests answered, batches, failed requests, mean batch size, requests per 
+                               second since start and latency percentiles in milliseconds over the recent requests
+        """
+        elapsed = time.perf_counter() - self.started
+        latencies = sorted(self.latencies)
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        return {"requests": self.requests, 
+                "batches": self.batches,
+                "errors": self.errors,
+                "mean_batch": self.requests / self.batches if self.batches else 0.0,
+                "qps": self.requests / elapsed if elapsed else 0.0,
+                "latency_ms": {"p50": percentile(0.50), "p95": percentile(0.95), "p99": percentile(0.99), 
+                               "max": percentile(1.0)}}
+
+class AutoCompleteClient:
+    """
+    Class Description : asyncio client of AutoCompleteServer, to use and test a server locally. One client sends requests in
+                        order on one connection, so a client should not be used by several tasks at the same time.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        """ Connects to a server on host and port, or on the Unix socket path if given """
+        if path is None:
+            reader, writer = await asyncio.open_connection(host, port)
+        else:
+            reader, writer = await asyncio.open_unix_connection(path)
+        return cls(reader, writer)
+
+    async def complete(self, prompt):
+        """ Returns the server's autoComplete result for prompt """
+        return (await self.complete_many([prompt]))[0]
+
+    async def complete_many(self, prompts):
+        """
+        Function description : Sends every prompt before reading the responses, so the server answers them in as few batches as 
+                               it can. Raises RuntimeError once every response is read if the server failed any of them.
+        """
+        for prompt in prompts:
+            if "\n" in prompt or prompt == AutoCompleteServer.STATS:
+                raise ValueError("prompt " + repr(prompt) + " can't be sent as one request line")
+        for prompt in prompts:
+            self.writer.write(prompt.encode("utf-8") + b"\n")
+        await self.writer.drain()
+
+        results = [json.loads(await self.reader.readline()) for prompt in prompts]
+        for result in results:
+            if isinstance(result, dict):
+                raise RuntimeError("server failed the request : " + result["error"])
+        return results
+
+    async def stats(self):
+        """ Returns the server's stats() """
+        self.writer.write(AutoCompleteServer.STATS.encode() + b"\n")
+        await self.writer.drain()
+        return json.loads(await self.reader.readline())
+
+    async def close(self):
+        """ Closes the connection """
+        self.writer.close()
+        await self.writer.wait_closed()
+
+def read_sentences(lines, counted=False):
+    """
+    Function description : Generator turning lines of text into sentences for CatsTrie.from_iterable, removing line endings.
+                           With counted, each line is "sentence<TAB>count" and (sentence, count) tuples are generated.
+                           Empty lines are skipped in both modes, the empty sentence can only be given counted, as "<TAB>count".
+
+    Time complexity : O(M) per line, where M is the length of the line
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\r\n")
+        if not line:
+            continue
+        if not counted:
+            yield line
+            continue
+
+        sentence, tab, count = line.rpartition("\t")
+        if not tab or not count.isdigit():
+            raise ValueError("line " + str(number) + " is not sentence<TAB>count : " + repr(line))
+        yield sentence, int(count)
+
+# run by every worker of build_parallel with the module name and path of this script, loads it unless the worker has it already
+SHARD_LOADER = """
+import importlib.util, sys
+if name not in sys.modules:
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+"""
+
+def build_shard(sentences, top_k_size, alphabet):
+    """
+    Function description : Builds the CatsTrie of sentences and returns its binary form, run in a worker process by 
+                           CatsTrie.build_parallel
+
+    Time complexity : O(NM + NK), where N is number of sentence in sentences, M is number of characters in the longest 
+                      sentence and K is top_k_size
+    """
+    with gc_paused():
+        return CatsTrie(sentences, top_k_size, alphabet=alphabet).to_bytes()
+
+
+@contextmanager
+def gc_paused():
+    """
+    Function description : Context manager pausing the garbage collector, for bulk construction of nodes which can't create
+                           reference cycles to collect but would trigger collections scanning every node built so far
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
 
 if __name__ == "__main__":
     pass
@@ -1,6 +1,7 @@
+from array import array  # flat CSR buffers of CarpoolRouter
 import math  # to use inf
 
-def optimalRoute(start, end, passengers_list, roads):
+def optimalRoute(start, end, passengers_list, roads, heuristic=None):
     """
     Function description : This function returns a list of vertices to pass through to get to the destination edge with the least total accumulated weights.
                            This function uses Dijkstra's concept to find the shortest path to each vertex and after getting the shortest path for each vertex.
@@ -8,289 +9,402 @@ def optimalRoute(start, end, passengers_list, roads):
     
 
     Approach description : Because the original graph provided by the problem results in edges having 2 weights, one solo and one carpool time. We can simplify it
-                           for dijkstra by making an extra copy of vertices in the same list. This makes the vertices list twice the size 
-                           which gives an auxillary space : O(2L) = O(L). 
+                           for dijkstra by making an extra copy of every location, so the graph has 2L vertices which gives an auxillary space : O(2L) = O(L). 
 
                            Theoretically, it is possible to have any vertex where when the driver already has a passenger in the car, it's just a matter of reachability.
                            On the contrary, it is impossible to not fetch a passenger when the vertex already has a passenger (vertex is in passenger_list).
-                           Therefore, in the graph's vertices list, True means a passenger is present, False means it's solo. For the first section of the list, all
-                           True exists but only for vertices where it's not in passenger_list, a vertex with False is able to exist and it is places at the back section
-                           after minusing the original set of vetices and placing it in its index position.
+                           Therefore vertex v, the front section, means a passenger is present at location v and vertex L + v, the back section, means it's solo.
+                           A solo vertex only has edges for locations where no passenger waits.
 
-                           The edges are added which takes O(R) time because there are R edges to be added. There are three cases for adding edges.
-                           All carpool edges are added but only solo edges where it is not coming from a vertex in passenger list is added.
+                           The edges are added which takes O(R) time because there are R edges to be added. All carpool edges are added but only solo edges 
+                           where it is not coming from a vertex in passenger list is added, reaching the passenger vertex when a passenger waits at the other end.
+                           This way we have a graph with all edges only having one weight, stored in the flat CSR arrays of CarpoolRouter.
 
-                           This way we have a graph with all edges only having one weight.
-
-                           Dijkstra's algorithm is then ran from the start vertex to update the each vertex's (MinFrmStart) which is the smallest distance
-                           from starting vertex. 
+                           Dijkstra's algorithm is then ran from the start vertex to update the each vertex's distance from the starting vertex. 
                            
                            Discovered is stored in a heap to know which is the vertex with the smallest weight we should examine next. Everytime a vertex is discoverec
-                           but not processed it is added to the heap. 
+                           but not processed it is added to the heap, and when a shorter time to it is found while it waits its entry is decreased in place.
 
-                           The while loop until discovered is empty costs O(R log 2L), O(log 2L) is from extractMin heap function and O(R) because we are looping each edge.
                            At every loop, adjacent edges are checked for the current vertex and for every edge we can find the weight needed to reach it's adjacent vertex
-                           by adding the current vertex's MinFrmStart with the weight and update it if a smaller weight can be found. We can then add the adjacent vertices to the heap.
+                           by adding the current vertex's distance with the weight and update it if a smaller weight can be found. We can then add the adjacent vertices to the heap.
+
+                           Only the end vertex matters, so dijkstra stops as soon as either vertex of end is settled instead of exploring the whole graph. With a heuristic, 
+                           vertices are extracted in order of minutes from start plus the estimated minutes left to end (A*), so the search heads towards end and settles 
+                           fewer vertices.
 
-                           Dijkstra updates all the vertices with the correct minutes taken from start and the previous vertex to get that weight.
                            Back tracing be done to get the path need for the optimal solution.It starts from the final vertex and following each pervious vertex up till the starting vertex.
                            Since the tuples are in reverse. We can reverse it by popping off the stack to get the final path.
                            Back tracing takes O(2L) as the worst case is passing through all the locations.
 
                             Time complexity Explanation:
-                                O(R + P + L + R) - from graph initialization ( get_largest_vertex, creating boolean list, adding locations, adding roads)
-                                O(log L + O((L + R) log L)) -  from dijkstra ( adding starting vertex, edge relaxation with add involving rising)
+                                O(R + P + L) - from graph initialization ( get_largest_vertex, creating passenger list, counting and adding roads)
+                                O((L + R) log L) -  from dijkstra ( edge relaxation with add and decrease_key involving rising)
                                 O(L + L) - from back tracing ( tracing back every vertex, reversing stack)
 
                             Aux space complexity Explanation:
-                                O(L) - storing passenger_list in boolean list form
-                                O(L) - storing vertices in a graph
-                                O(R) - Min Heap to store path
-                                O(R) - list to store output path
+                                O(L) - storing passenger_list in bytearray form and the distances of the vertices
+                                O(L + R) - storing the CSR arrays of the graph
+                                O(L) - Min Heap to store path, each vertex is in it at most once
+                                O(L) - list to store output path
 
                         Input : 
                                 start - starting vertex
                                 end - destination vertex
                                 passenger_list - vertices where no passengers can't exist
                                 roads - list of tuples with edges information and weight
+                                heuristic - optional function from a location to a lower bound of the minutes from it to end, like 
+                                            straight_line_heuristic. It must never overestimate and must be consistent : for every road
+                                            heuristic(u) <= minutes of the road + heuristic(v), else the path may not be optimal
                         Output :
-                                a list containing vertices to pass through to get optimal solution
+                                a list containing vertices to pass through to get optimal solution, None if end can't be reached
 
 
-    Time complexity : O(L log L) where R is the number of edges and L is the number of vertices
+    Time complexity : O(R log L) where R is the number of edges and L is the number of vertices
     Aux space complexity : O(L + R) where L is the number of locations and R is number of roads
 
 
     """
 
-    # creates a graph object by calling graph class
-    graph = Graph(start, end, passengers_list, roads)
-
-    # runs dijkstra to update all vertices in the graph with the shortest path to get to each them - O(R log L)
-    graph.dijkstra(graph.start)
-    
-    # using the info from dijsktra we backtrack from the end by using each previous vertex to get the final path - O(L)
-    path = graph.traceBack(start,end)
+    # builds the two layer graph, use a CarpoolRouter directly to answer several queries on the same roads - O(R + P + L)
+    router = CarpoolRouter(roads, passengers_list)
 
-    min_dist = graph.vertices[end].MinFrmStart  ### to check total time taken
-    return path
+    # runs dijkstra until end is reached and backtracks from it by using each previous vertex to get the final path - O(R log L)
+    return router.route(start, end, heuristic)
     
-class Graph:
+class CarpoolRouter:
     """
-        Class Description: A graph is created to represent the map of the Location and roads
-                           start: the starting location
-                           end: destination 
-                           vertices: a list of vertices representing Locations
-                           passenger_list: input passengers_list but representing in a list form with boolean
+    Class Description: Answers optimalRoute queries for many starts and ends on the same roads and passengers, building the graph once.
+
+                       The graph is built with no destination, so every location without passengers has both its passenger and solo vertex
+                       and roads out of every location are kept. A query then stops at whichever vertex of end is settled first.
+
+                       The two layer graph is stored in compressed sparse row (CSR) form instead of vertex and edge objects. Slot v is the 
+                       passenger vertex of location v and slot L + v its solo vertex. The edges out of 
+                       slot s are positions offsets[s] to offsets[s + 1] - 1 of targets, the slot each edge goes to, and weights, its minutes.
+                       These are three flat typed arrays, a few bytes per edge instead of several Python objects.
+
+                       Distances, previous vertices and settled marks live in lists reused by every query instead of on the vertices.
+                       Each entry has a stamp of the query that last wrote it, and an entry whose stamp isn't the current query counts 
+                       as unvisited, so nothing is reset or reallocated between queries.
+                       offsets, targets, weights : the CSR buffers
+                       reverse_offsets, sources, reverse_weights : the CSR buffers of the edges into every slot, built by the first
+                                                                   route_bidirectional
+                       passengers_list : a bytearray with 1 for every location with a passenger
+                       minutes : the total minutes of the last route found, math.inf when there was none
+                       relaxations : edges examined by the last route
+    """
+    def __init__(self, roads, passengers):
         """
+        Initialisation of the router, building the CSR buffers and the reusable lists once
 
-    def __init__(self, start, end, passengers_list, roads):
-        """ 
-        Initialising the graph and modifying it to solve the problem with the concept of splitting vertices into two parts in a list
+        Approach description : The CSR buffers are filled like a counting sort. The first pass over roads counts the edges out of every 
+                               slot, a road always gives an edge out of its passenger vertex using the carpool minutes and, when its 
+                               location has no passenger, an edge out of its solo vertex using the solo minutes, which reaches the 
+                               passenger vertex if a passenger waits at the other end. The running sum of the counts gives offsets,
+                               and the second pass writes each edge at the next free position of its slot.
 
-        Time complexity : O(R + P + L + R), where P is number of Passengers, L is number of Locations and R is number of roads
-        Aux space complexity : O(L) + O(L), where L is number of Locations
+        Time complexity : O(R + P + L), where P is number of Passengers, L is number of Locations and R is number of roads
+        Aux space complexity : O(L + R)
         """
-        self.start = start
-        self.end = end
-        self.vertices = []
-        self.passengers_list = passengers_list
-
         # Get the largest vertex, + 1 to include vertex 0 - O(R)
-        self.num_of_vertices = get_largest_vertex(roads)+ 1
-    
-        # turn passenger_list (input) into a list of True and False for O(1) access later - O(L) time complexity and aux space complexity
-        self.passengers_list = [False] * (self.num_of_vertices + 1)
-
-        for location in passengers_list:                   # O(P) because looping every passenger_list item and replacing item takes constant time
-            self.passengers_list[location] = True
-            
-        # create a empty vertices Adjacency List with double the number of vertices, this is because the front num_of_vertices are to store vertex where passengers are on board
-        self.vertices = [None] * ((self.num_of_vertices*2))
-
-        # Assign Vertex object to the vertices list in graph - O(L)
-        # for every vertex a route where there is a passenger is possible, what matters is it's reachability, it can exist but not be reachable from the start
-        for vertex in range(self.num_of_vertices):
-            self.vertices[vertex] = Vertex(vertex, True)
-            # If the vertex already has a passenger, a Vertex without passenger is not possible, this makes only vertices without passengers waiting have a vertex where there are no passengers
-            # If it is the destination vertex, it doesn't matter if it's True or False but we can just let one vertex exist which is True even when there are no passengers
-            if self.passengers_list[vertex] == False and vertex != self.end:
-                self.vertices[vertex+ self.num_of_vertices] = Vertex(vertex, False)
-
-
-        # adding edges to the vertices - O(R) since all operations inside loop takes constant time, including add_edges
-        for road in roads:
-
-            # only pick roads where it is not coming out from destination as it redundant to add edges coming out from destination
-            if road[0] != self.end:
-                from_vertex = road[0]
-                to_vertex = road[1]
-
-                # Add edge for with passengers, an edge always exist
-                from_vertexPass = [from_vertex,True]
-                # add_adges is a function in Vertex class where it appends an edge (from vertex, to vertex, time needed)
-                # road[3] because if vertex True means there's a passenger so we can use carpool lane
-                self.vertices[from_vertex].add_edges(from_vertexPass, [to_vertex, True], road[3])
-
-                # If a vertex can exist without passengers, we have to add the edge where the solo lane is used
-                if self.passengers_list[from_vertex] == False:
-                    from_vertexPass = [from_vertex,False]
-                    # Two cases can exist
-                    # Case #1 : It is going from a vertex without passengers to a vertex in passenger_list
-                    if to_vertex == self.end or self.passengers_list[to_vertex]== True:
-                        self.vertices[self.num_of_vertices + from_vertex].add_edges(from_vertexPass, [to_vertex, True], road[2])
-                    # Case #2 : It is going from a vertex without passengers to another vertes without passengers
-                    else:
-                        self.vertices[self.num_of_vertices + from_vertex].add_edges(from_vertexPass, [to_vertex, False], road[2])
-        
-        
+        n = self.num_of_vertices = get_largest_vertex(roads) + 1
+        size = 2 * n
 
-    def dijkstra(self, starting_vertex):
-        """"
-        Function description : This function updates all the vertices's weight from start and also noting it's previous vertex to get to that weight
-        
-        Approach description : It uses a BFS concept where it goes to all vertices and picking the next smallest vertex to discover next using a Min Heap.
-                               From each vertex it checks the adjacent vertex to see if a shorter minutes taken can be found. If yes, it's MinFrmStart and previous 
-                               will be updated
-                               
-        Time complexity: O(R log L), where L is number of locations
-        Aux space complexity: O(L), where L is number of locations
+        self.passengers_list = bytearray(n)
+        for location in passengers:
+            self.passengers_list[location] = 1
+        has_passenger = self.passengers_list
 
+        # count the edges out of every slot, shifted by one for the running sum - O(R)
+        offsets = array("i", [0]) * (size + 1)
+        for road in roads:
+            offsets[road[0] + 1] += 1
+            if not has_passenger[road[0]]:
+                offsets[n + road[0] + 1] += 1
+        for slot in range(size):
+            offsets[slot + 1] += offsets[slot]
+
+        # write every edge at the next free position of its slot - O(R)
+        targets = array("i", [0]) * offsets[size]
+        weights = array("d", [0.0]) * offsets[size]
+        free = array("i", offsets)
+        for road in roads:
+            from_vertex, to_vertex = road[0], road[1]
+            position = free[from_vertex]
+            targets[position] = to_vertex
+            weights[position] = road[3]
+            free[from_vertex] += 1
+
+            if not has_passenger[from_vertex]:
+                slot = n + from_vertex
+                position = free[slot]
+                targets[position] = to_vertex if has_passenger[to_vertex] else n + to_vertex
+                weights[position] = road[2]
+                free[slot] += 1
+
+        self.offsets = offsets
+        self.targets = targets
+        self.weights = weights
+
+        self.dist = [math.inf] * size          ### minutes from start of every slot, only valid when stamp is the current query
+        self.previous = [-1] * size             ### slot the shortest minutes came from, -1 for start
+        self.stamp = [0] * size                 ### query that last wrote dist and previous of the slot
+        self.settled = [0] * size               ### query in which the slot was settled
+        self.discovered = MinHeap(size)
+        self.query = 0
+        self.minutes = math.inf
+        self.relaxations = 0
+
+        # reverse graph and the lists of the backward search, only built when route_bidirectional is used
+        self.reverse_offsets = None
+        self.sources = None
+        self.reverse_weights = None
+
+    def build_reverse(self):
         """
-        # since in adjacent list of vertices, the starting vertex wihout passenger starts at the second part of the list after all the vertices with passengers
-        starting_Vertex = self.vertices[starting_vertex + self.num_of_vertices]
+        Function description : Builds the CSR buffers of the reversed graph, the edges into every slot, and the reusable lists of
+                               the backward search of route_bidirectional
 
-        # Initialization of starting vertex
-        starting_Vertex.MinFrmStart = 0
-        starting_Vertex.previous = 0
+        Approach description : The same counting sort as the forward buffers, counting the edges into every slot in targets and 
+                               then writing the slot each edge comes from at the next free position of the slot it goes to.
 
-        # a Min Heap to store vertex's distance from the starting vertex and the Vertex itself
-        discovered = MinHeap()
-        # adding the starting vertex into Heap - (log L)
-        discovered.add(0, starting_Vertex)
+        Time complexity : O(L + R), where L is number of locations and R is number of roads
+        Aux space complexity : O(L + R)
+        """
+        size = 2 * self.num_of_vertices
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+
+        reverse_offsets = array("i", [0]) * (size + 1)
+        for to_slot in targets:
+            reverse_offsets[to_slot + 1] += 1
+        for slot in range(size):
+            reverse_offsets[slot + 1] += reverse_offsets[slot]
+
+        sources = array("i", [0]) * len(targets)
+        reverse_weights = array("d", [0.0]) * len(targets)
+        free = array("i", reverse_offsets)
+        for from_slot in range(size):
+            for position in range(offsets[from_slot], offsets[from_slot + 1]):
+                to_slot = targets[position]
+                sources[free[to_slot]] = from_slot
+                reverse_weights[free[to_slot]] = weights[position]
+                free[to_slot] += 1
+
+        self.reverse_offsets = reverse_offsets
+        self.sources = sources
+        self.reverse_weights = reverse_weights
+
+        self.dist_back = [math.inf] * size     ### minutes from the slot to end, only valid when stamp_back is the current query
+        self.next_slot = [-1] * size            ### slot after this one on the shortest way to end, -1 for end
+        self.stamp_back = [0] * size
+        self.settled_back = [0] * size
+        self.discovered_back = MinHeap(size)
+
+    def route(self, start, end, heuristic=None):
+        """
+        Function description : Returns the list of locations to pass through from start to end with the least total minutes, like 
+                               optimalRoute, or None if end can't be reached. heuristic is the optional A* estimate of optimalRoute.
+                               Starting at a location with a passenger picks the passenger up right away.
 
+        Approach description : Dijkstra from start over the CSR buffers, with the indexed MinHeap, stopping once either vertex of end
+                               is settled. The query number is increased first so every stamp of the previous queries is stale,
+                               which takes O(1) instead of resetting the lists.
 
-        # Stops when all Locations are discovered  - O((L + R) log L) because each location is visited once and each edge is relaxed once
-        while discovered.count > 0:
-            # extractMin function from heap gets the smallest distance from Heap, this is to ensures we always continue with the 
-            # smallest possible edge to pass at every iteration - O(log L) due to sinking
-            [distFromStart, curr_Vertex] = discovered.extractMin()
-
-            adjacentEdges = curr_Vertex.edges
-
-            # Edge Relaxation, checks all edges and if a shorter time is found to it's neighbours, it updates the MinFrmStart of the neighbours
-            # Total complexity = O(R log L)
-            # Explanation : This loops O(R) time because all the roads has to be examined once and each location's MinFrmStart 
-            #               is only updated once. 
-            #               O(log L) is because the inner operations of min heap, such as add that contains rising cost O(log L)
-            for edge in adjacentEdges:
-
-                # Check if the vertex we are going to has passenger, if yes, it's vertex position in self.vertices is the front part, else is the second
-                if edge.v[1] == True:
-                    to_Vertex = self.vertices[edge.v[0]]
-                else:
-                    to_Vertex = self.vertices[edge.v[0] + self.num_of_vertices]
-
-                edgeWeight = edge.w
-                
-                # if we can reach to_vertex with a shorter time with the current vertex + the time taken to get to to_vertex
-                if to_Vertex.MinFrmStart > curr_Vertex.MinFrmStart + edgeWeight:
-                    # we can update it together with the position
-                    to_Vertex.MinFrmStart = curr_Vertex.MinFrmStart + edgeWeight
-                    to_Vertex.previous = curr_Vertex
-        
-                    # Add entry to min-heap with an updated distance
-                    discovered.add(to_Vertex.MinFrmStart, to_Vertex)
-              
-    def traceBack(self, start, end):
+        Time complexity : O(R log L) in the worst case, where L is number of locations and R is number of roads
+        Aux space complexity : O(L) for the output path, the lists are reused
         """
-        Function description: This function returns a list of vertices needed to pass through to get to the end vertex from the start.
+        n = self.num_of_vertices
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        dist, previous, stamp, settled = self.dist, self.previous, self.stamp, self.settled
+        discovered = self.discovered
+
+        self.query += 1
+        query = self.query
+        self.relaxations = 0
+        self.minutes = math.inf
+        discovered.clear()
+
+        # a start with a passenger waiting has no solo vertex
+        starting_slot = start if self.passengers_list[start] else start + n
+        dist[starting_slot] = 0
+        previous[starting_slot] = -1
+        stamp[starting_slot] = query
+        discovered.add(0 if heuristic is None else heuristic(start), starting_slot)
+
+        reached = -1
+        while discovered.count > 0:
+            [key, curr_slot] = discovered.extractMin()
+            settled[curr_slot] = query
 
-        Approach description: Since we have the shortest minutes needed to get to each vertex from Dijkstra. We can trace back from 
-                              the end vertex by following the vertex's previous vertex until we reach the starting vertex.
+            # end in either the passenger or the solo part of the list
+            if curr_slot == end or curr_slot == end + n:
+                reached = curr_slot
+                break
 
-                              Worst case is we have to pass by every location twice before getting to end vertex which cost O(2L).
-                              Reversing the stack to get output path also takes O(2L) in the worst case
+            curr_dist = dist[curr_slot]
+            for position in range(offsets[curr_slot], offsets[curr_slot + 1]):
+                to_slot = targets[position]
+                if settled[to_slot] == query:
+                    continue
+                self.relaxations += 1
+
+                # a slot not written by this query has no distance yet
+                new_dist = curr_dist + weights[position]
+                if stamp[to_slot] != query or new_dist < dist[to_slot]:
+                    dist[to_slot] = new_dist
+                    previous[to_slot] = curr_slot
+                    stamp[to_slot] = query
+
+                    if heuristic is not None:
+                        new_dist += heuristic(to_slot if to_slot < n else to_slot - n)
+                    if to_slot in discovered:
+                        discovered.decrease_key(to_slot, new_dist)
+                    else:
+                        discovered.add(new_dist, to_slot)
+
+        if reached == -1:
+            return None
+        self.minutes = dist[reached]
+        return self.traceBack(reached)
+
+    def traceBack(self, slot):
+        """
+        Function description: Returns the list of locations from start to the vertex slot of the last route search, following the 
+                              previous slot of every vertex back to start and reversing them with a stack.
 
-                              The stack takes up O(L) space and output list takes O(L)
-        
         Time complexity: O(L), where L is the number of Locations
         Aux space complexity: O(L), where L is the number of Locations
         """
-        # Initialisation of output path and the temporary pathStack to be reversed later
-        path = []
+        n = self.num_of_vertices
         pathStack = Stack()
+        while slot != -1:
+            pathStack.push(slot if slot < n else slot - n)
+            slot = self.previous[slot]
 
-        # destination vertex always assigned to the first section in Graph implementation
-        end_Vertex = self.vertices[end] 
-        # start vertex has no passengers so it's the back section for no passengers
-        start_Vertex = self.vertices[self.num_of_vertices + start]
-        
-        # pushed the last vertex to stack because it is part of the path
-        pathStack.push(end_Vertex.id)
+        path = []
+        for i in range(pathStack.getSize()):
+            path.append(pathStack.pop())
+        return path
 
-        # get previous vertex by previous from the current vertex
-        previous_Vertex = end_Vertex.previous 
-        pathStack.push(previous_Vertex.id)
+    def route_bidirectional(self, start, end):
+        """
+        Function description : Returns the same route as route, the list of locations from start to end with the least total minutes
+                               or None if end can't be reached, searching from both ends so fewer vertices are settled on long routes.
 
-        # continue until we reached the start_vertex - the worst case is needing to go through all vertices once, a vertex can only appear at most twice
-        while previous_Vertex != start_Vertex:
-            previous_Vertex = previous_Vertex.previous
-            pathStack.push(previous_Vertex.id)
-        
-        # pop all items from stack to a list to reverse the back tracked paths - O(2L)
-        for i in range(Stack.getSize(pathStack)):
-            item = pathStack.pop()
-            path.append(item)
+        Approach description : A forward Dijkstra runs from the vertex of start over the CSR buffers and a backward Dijkstra runs from 
+                               end over the reversed buffers. The backward search starts from both vertices of end at 0 minutes, 
+                               since arriving at end with or without a passenger finishes the route, and from there it follows the 
+                               carpool layer transitions in reverse like any other edge.
 
-        return(path)
-        
-class Vertex:
-    """
-    Class Description: A Vertex can be used to represent the locations in a graph
-                       id : to indentify the location
-                       edges : the edges coming out from the vertex
-                       hasPassenger : to indicate if vertex has a passenger, TRUE means all roads after can use carpool
-                       MinFrmStart : an int to be later updated in Dijkstra to store the shortest minutes needed to get to the vertex
-                       previous : the vertex added after MinFrmStart in Dijkstra to store the vertex to go FROM to get that shortest minutes
-                       
-    """
-    def __init__(self, id, hasPassenger):
-        self.id = id
-        self.edges = []
-        self.hasPassenger = hasPassenger  ### True means a passenger exist in the vertex, and False means solo
-        self.MinFrmStart = math.inf      ### to be updated later in dijkstra, inf for a large number to be replaced
-        self.previous = None
-
-    def __str__(self):
-        """ When print() is used on a vertex, this provides an organised return string"""
-        if self.hasPassenger == True:
-            return_string = "Vertex " + str(self.id) + " with passenger with edges" + str(self.edges) + "\n" + " From Source: " + str(self.MinFrmStart)
-        else:
-            return_string = "Vertex " + str(self.id) + " no passenger with edges" + str(self.edges) + "\n" + " From Source: " + str(self.MinFrmStart)
-        return return_string
-    
-    def add_edges(self,frm_vertex, to_vertex, minutes):
-        """ adds an edge from Edge Class to the vertex's edges list"""
-        self.edges.append(Edge(frm_vertex, to_vertex, minutes))
+                               Every step extends the search whose next vertex is closer. Whenever a slot gets a distance from one 
+                               search and already has one from the other, the route through it is a candidate and the best candidate
+                               minutes are kept in best. Once the smallest keys of the two heaps add up to at least best, no route 
+                               through an unsettled vertex can be shorter, so best is the shortest route and the searches stop.
 
-class Edge:
-    """
-    Class Description: An edge can be used to represent a road in the Graph.
-                       u : From vertex / location
-                       v : To vertex / location
-                       w : Weight of edge / Time taken from Vertex to the other Vertex
-    """
-    def __init__(self, u, v, w):
-        """ Initialisation of an edge """
-        self.u = u
-        self.v = v
-        self.w = w
-        
-    def __str__(self):
-        """ When print() is used on an edge, this provides an organised return string"""
-        return_string =  "From: " + str(self.u) + " To: " + str(self.v) + " Time: " + str(self.w) 
-        return return_string
+                               The route is the forward previous slots from the meeting slot back to start followed by the backward
+                               next_slot entries from the meeting slot to end, as locations.
+
+        Time complexity : O(R log L) in the worst case, where L is number of locations and R is number of roads
+        Aux space complexity : O(L) for the output path, the lists are reused
+        """
+        if self.reverse_offsets is None:
+            self.build_reverse()
+
+        n = self.num_of_vertices
+        offsets, targets, weights = self.offsets, self.targets, self.weights
+        reverse_offsets, sources, reverse_weights = self.reverse_offsets, self.sources, self.reverse_weights
+        dist, previous, stamp, settled = self.dist, self.previous, self.stamp, self.settled
+        dist_back, next_slot, stamp_back, settled_back = self.dist_back, self.next_slot, self.stamp_back, self.settled_back
+        discovered, discovered_back = self.discovered, self.discovered_back
+
+        self.query += 1
+        query = self.query
+        self.relaxations = 0
+        self.minutes = math.inf
+        discovered.clear()
+        discovered_back.clear()
+
+        best = math.inf
+        meeting = -1
+
+        # forward search from the vertex of start, with its passenger if one waits there
+        starting_slot = start if self.passengers_list[start] else start + n
+        dist[starting_slot] = 0
+        previous[starting_slot] = -1
+        stamp[starting_slot] = query
+        discovered.add(0, starting_slot)
+
+        # backward search from both vertices of end, a location with a passenger waiting has no solo vertex
+        for end_slot in (end, end + n):
+            if end_slot == end + n and self.passengers_list[end]:
+                continue
+            dist_back[end_slot] = 0
+            next_slot[end_slot] = -1
+            stamp_back[end_slot] = query
+            discovered_back.add(0, end_slot)
+            if end_slot == starting_slot:
+                best, meeting = 0, end_slot
+
+        while discovered.count > 0 and discovered_back.count > 0:
+            # no route through a vertex not yet settled can beat best
+            if discovered.array[1][0] + discovered_back.array[1][0] >= best:
+                break
+
+            if discovered.array[1][0] <= discovered_back.array[1][0]:
+                [curr_dist, curr_slot] = discovered.extractMin()
+                settled[curr_slot] = query
+                for position in range(offsets[curr_slot], offsets[curr_slot + 1]):
+                    to_slot = targets[position]
+                    if settled[to_slot] == query:
+                        continue
+                    self.relaxations += 1
+
+                    new_dist = curr_dist + weights[position]
+                    if stamp[to_slot] != query or new_dist < dist[to_slot]:
+                        dist[to_slot] = new_dist
+                        previous[to_slot] = curr_slot
+                        stamp[to_slot] = query
+                        if to_slot in discovered:
+                            discovered.decrease_key(to_slot, new_dist)
+                        else:
+                            discovered.add(new_dist, to_slot)
+
+                        # the backward search reached to_slot too, a route through it is a candidate
+                        if stamp_back[to_slot] == query and new_dist + dist_back[to_slot] < best:
+                            best, meeting = new_dist + dist_back[to_slot], to_slot
+            else:
+                [curr_dist, curr_slot] = discovered_back.extractMin()
+                settled_back[curr_slot] = query
+                for position in range(reverse_offsets[curr_slot], reverse_offsets[curr_slot + 1]):
+                    from_slot = sources[position]
+                    if settled_back[from_slot] == query:
+                        continue
+                    self.relaxations += 1
+
+                    new_dist = curr_dist + reverse_weights[position]
+                    if stamp_back[from_slot] != query or new_dist < dist_back[from_slot]:
+                        dist_back[from_slot] = new_dist
+                        next_slot[from_slot] = curr_slot
+                        stamp_back[from_slot] = query
+                        if from_slot in discovered_back:
+                            discovered_back.decrease_key(from_slot, new_dist)
+                        else:
+                            discovered_back.add(new_dist, from_slot)
+
+                        if stamp[from_slot] == query and dist[from_slot] + new_dist < best:
+                            best, meeting = dist[from_slot] + new_dist, from_slot
+
+        if meeting == -1:
+            return None
+        self.minutes = best
+
+        # trace back from the meeting slot to start, then follow the backward search from the meeting slot to end - O(L)
+        path = self.traceBack(meeting)
+        slot = next_slot[meeting]
+        while slot != -1:
+            path.append(slot if slot < n else slot - n)
+            slot = next_slot[slot]
+        return path
 
 def get_largest_vertex(lst):
     """
@@ -309,11 +423,32 @@ def get_largest_vertex(lst):
             largest_vertex = x[1]
     return largest_vertex
 
+def straight_line_heuristic(coordinates, end, speed):
+    """
+    Function description : Returns a heuristic for optimalRoute, the straight line distance from a location to end divided by speed.
+                           coordinates is a list of (x, y) of every location and speed the highest distance covered per minute on any
+                           road, carpool lanes included. No road is then faster than a straight line at that speed, so the estimate
+                           never overestimates and is consistent by the triangle inequality.
+
+    Time complexity: O(1) per estimate
+    """
+    end_x, end_y = coordinates[end]
+
+    def heuristic(location):
+        x, y = coordinates[location]
+        return math.hypot(x - end_x, y - end_y) / speed
+
+    return heuristic
+
 class MinHeap:
     """
     Class description: A min heap data structure taken from FIT1008's min heap implementation written by Brendon Taylor and modified by Jackson Goerner
                        with some functions modified for Dijkstra to add lists.
 
+                       Items are integer slots, the vertices of CarpoolRouter, and the heap keeps the index of every slot in its array.
+                       This makes it an indexed heap : a slot is in the heap at most once, membership is checked in O(1) and decrease_key
+                       lowers a slot's key where it is instead of adding a duplicate entry, so the heap never holds more than capacity items.
+
     Time complexity to take note when used with Dijkstra:
                        - Adding All locations: 
                             O(L log L), where L is number of locations 
@@ -324,28 +459,59 @@ class MinHeap:
                             O(L log L), where L is number of locations 
                             Explanation: because we have to check every location meaning we have to loop ExtractMin() O(L) times, 
                             and in each ExtractMin function, sink takes (log L), therefore O(L log L).
+
+                       - Decreasing keys: 
+                            O(R log L), where R is number of roads
+                            Explanation: at most one decrease_key per edge relaxed, and each rises in O(log L).
     """
-    def __init__(self):
-        """ Initialisation of the Min Heap using array"""
+    def __init__(self, capacity):
+        """ Initialisation of the Min Heap using array, for slots 0 to capacity - 1 """
         self.array = [None]
         self.count = 0
+        self.index = [0] * capacity     ### position of every slot in array, 0 when the slot is not in the heap
 
     def __len__(self):
         """ Counts number of items in Min Heap"""
         return self.count
 
-    def add(self, MinFrmStart, PrevLocation):
+    def __contains__(self, slot):
+        """ True if slot is in the Min Heap - O(1) """
+        return self.index[slot] != 0
+
+    def add(self, MinFrmStart, slot):
         """ 
         Adds an item to Min Heap, modified in a way that it's a list instead of an item
-        List contains [ The shortest time taken from starting location, the previous location to get this time]
+        List contains [ The shortest time taken from starting location, the slot of the vertex with this time]
         """
-        self.array.append([MinFrmStart, PrevLocation])
+        self.array.append([MinFrmStart, slot])
         self.count += 1
+        self.index[slot] = self.count
         self.rise(self.count)  ### rise to ensure it's at the correct position in Min Heap
 
+    def decrease_key(self, slot, MinFrmStart):
+        """
+        Lowers the time of a slot already in the Min Heap and rises it to it's correct position
+        Time complexity = O(log L), where L is number of locations
+        """
+        k = self.index[slot]
+        self.array[k][0] = MinFrmStart
+        self.rise(k)
+
+    def clear(self):
+        """
+        Removes every item left in the Min Heap, so it can be reused for another search
+        Time complexity = O(N), where N is the number of items left
+        """
+        for item in self.array[1:]:
+            self.index[item[1]] = 0
+        self.array = [None]
+        self.count = 0
+
     def swap(self, i, j):
         """ Swaps the positions of two items"""
         self.array[i], self.array[j] = self.array[j], self.array[i]
+        self.index[self.array[i][1]] = i
+        self.index[self.array[j][1]] = j
 
     def rise(self, k):
         """
@@ -384,6 +550,7 @@ class MinHeap:
         """
         self.swap(1, self.count)
         min = self.array.pop(self.count)
+        self.index[min[1]] = 0
         self.count -= 1
         self.sink(1)
         return min